@@ -0,0 +1,361 @@
+"""
+Offline benchmark for the Paper Downloader pipeline.
+
+Starts a local HTTP server that stands in for both Google Scholar and the PDF
+hosts, then runs the headless --batch pipeline against it for each batch size
+in a fresh process (so every run starts cold and peak RSS is per run).
+Reports titles/min, MB/s, peak RSS and update-queue (GUI) latency.
+
+    python benchmark.py --sizes 10 100 1000 10000 --latency 0.05 --error-rate 0.05 --captcha-rate 0.01
+
+Results pages are synthetic unless --fixtures points at Scholar pages saved
+with the "scholar_fixture_dir" setting; their PDF links are rewritten to the
+local server. By default Scholar pages are fetched over plain HTTP instead of
+through Chrome (--browser chrome runs a headless Chrome instead).
+"""
+import os
+import re
+import sys
+import json
+import glob
+import time
+import queue
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+RESULTS_PER_PAGE = 10
+CAPTCHA_PAGE = ('<html><body><div id="gs_captcha_ccl"><h1>Please show you&#39;re not a robot</h1>'
+                '<div class="g-recaptcha"></div></div></body></html>')
+PAYWALL_PAGE = '<html><head><title>Sign in</title></head><body>Purchase this article to continue.</body></html>'
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # Clients drop keep-alive connections when a run ends
+            super().handle_error(request, client_address)
+
+
+class BenchServer:
+    """
+    Local stand-in for Scholar and the PDF hosts.
+    /scholar?q=…&start=… serves a results page (recorded or synthetic) and
+    /pdf/<id> a synthetic PDF of `pdf_size` bytes. Every response is delayed
+    by `latency` seconds; `error_rate` of PDF requests fail (a 503 or an HTML
+    paywall) and `captcha_rate` of results pages are CAPTCHA pages.
+    """
+    def __init__(self, latency=0.0, pdf_size=64 * 1024, error_rate=0.0, captcha_rate=0.0,
+                 pdf_fraction=0.5, fixtures=None, seed=0):
+        self.latency = latency
+        self.pdf_size = max(1024, pdf_size)
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.pdf_fraction = pdf_fraction
+        self.fixtures = [self._load(path) for path in fixtures or []]
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.filler = (b'0123456789abcdef' * 4096)[:64 * 1024]
+        bench = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like real hosts
+            disable_nagle_algorithm = True  # Otherwise delayed ACKs add ~40 ms to every small response
+
+            def do_GET(self):
+                if bench.latency:
+                    time.sleep(bench.latency)
+                url = urlparse(self.path)
+                if url.path == '/scholar':
+                    bench.serve_results(self, parse_qs(url.query))
+                elif url.path.startswith('/pdf/'):
+                    bench.serve_pdf(self, url.path[len('/pdf/'):])
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = QuietHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def _load(path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def chance(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+    def send(self, handler, status, body, content_type):
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def serve_results(self, handler, params):
+        query = params.get('q', [''])[0]
+        start = int(params.get('start', ['0'])[0])
+        if self.chance(self.captcha_rate):
+            self.send(handler, 200, CAPTCHA_PAGE.encode(), 'text/html; charset=utf-8')
+            return
+        key = hashlib.sha1(f'{query}/{start}'.encode()).hexdigest()[:12]
+        if self.fixtures:
+            page = self.fixtures[int(key, 16) % len(self.fixtures)]
+            links = iter(range(1000))
+            # Point the recorded PDF links at this server
+            page = re.sub(r'(<div class="gs_ggsd.*?<a href=")[^"]*',
+                          lambda m: f'{m.group(1)}{self.url}pdf/{key}-{next(links)}', page, flags=re.S)
+        else:
+            page = self.synthetic_page(query, start, key)
+        self.send(handler, 200, page.encode(), 'text/html; charset=utf-8')
+
+    def synthetic_page(self, query, start, key):
+        """A results page with Scholar's markup; the first pages are full, and roughly `pdf_fraction` of results have a PDF."""
+        rng = random.Random(key)
+        count = RESULTS_PER_PAGE if start < 3 * RESULTS_PER_PAGE else rng.randrange(RESULTS_PER_PAGE)
+        results = []
+        for i in range(count):
+            pdf = ''
+            if i == 0 or rng.random() < self.pdf_fraction:
+                pdf = (f'<div class="gs_ggs gs_fl"><div class="gs_ggsd"><div class="gs_or_ggsm">'
+                       f'<a href="{self.url}pdf/{key}-{i}"><span class="gs_ctg2">[PDF]</span> 127.0.0.1</a></div></div></div>')
+            results.append(
+                f'<div class="gs_r gs_or gs_scl" data-cid="{key}{i}" data-rp="{start + i}">{pdf}<div class="gs_ri">'
+                f'<h3 class="gs_rt"><a href="{self.url}paper/{key}-{i}">{query.replace(" + paper", "")} ({start + i})</a></h3>'
+                f'<div class="gs_a">A Author, B Author - Journal of Benchmarks, {2000 + rng.randrange(25)} - 127.0.0.1</div>'
+                f'<div class="gs_rs">Synthetic abstract.</div><div class="gs_fl gs_flb">'
+                f'<a href="/scholar?cites={int(key, 16) + i}&amp;hl=en">Cited by {rng.randrange(500)}</a> '
+                f'<a href="/scholar?cluster={int(key, 16) + i}&amp;hl=en">All 3 versions</a></div></div></div>')
+        return ('<!doctype html><html><head><title>Google Scholar</title></head><body><div id="gs_bdy">'
+                '<div id="gs_res_ccl"><div id="gs_res_ccl_mid">' + ''.join(results) +
+                '</div><div id="gs_res_ccl_bot"></div></div></div></body></html>')
+
+    def serve_pdf(self, handler, pdf_id):
+        if self.chance(self.error_rate):
+            if self.chance(0.5):
+                self.send(handler, 503, b'Service Unavailable', 'text/plain')
+            else:
+                self.send(handler, 200, PAYWALL_PAGE.encode(), 'text/html; charset=utf-8')
+            return
+        header = f'%PDF-1.4\n% {pdf_id}\n'.encode()  # Unique content, so the library never dedupes two PDFs
+        trailer = b'\n%%EOF\n'
+        body_size = self.pdf_size - len(header) - len(trailer)
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/pdf')
+        handler.send_header('Content-Length', str(self.pdf_size))
+        handler.end_headers()
+        handler.wfile.write(header)
+        while body_size > 0:
+            chunk = self.filler[:body_size]
+            handler.wfile.write(chunk)
+            body_size -= len(chunk)
+        handler.wfile.write(trailer)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TimedQueue(queue.Queue):
+    """A Queue that records how long each item waited between put() and get()."""
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        self.latencies = deque(maxlen=100000)
+
+    def _put(self, item):
+        self.queue.append((time.perf_counter(), item))
+
+    def _get(self):
+        queued_at, item = self.queue.popleft()
+        self.latencies.append(time.perf_counter() - queued_at)
+        return item
+
+
+def make_http_browser(pd):
+    """
+    A BrowserSession replacement that loads pages with plain HTTP, so the
+    pipeline can be benchmarked where Chrome isn't installed. A CAPTCHA page
+    is "solved" by loading the page again once the pipeline has noticed it.
+    """
+    class HttpDriver:
+        def __init__(self):
+            self.session = pd.requests.Session()
+            self.url = None
+            self.page_source = ''
+            self.noticed_block = False
+            self.current_window_handle = 'bench'
+
+        def get(self, url):
+            self.url = url
+            self.noticed_block = False
+            self.page_source = self.session.get(url, timeout=30).text
+
+        def find_element(self, by, value):
+            if pd.is_blocked_page(self.page_source):
+                if not self.noticed_block:
+                    self.noticed_block = True
+                    raise pd.selenium_exceptions.NoSuchElementException(value)
+                self.get(self.url)
+            if f'id="{value}"' not in self.page_source:
+                raise pd.selenium_exceptions.NoSuchElementException(value)
+            return value
+
+    class HttpBrowserSession:
+        def __init__(self, *args, **kwargs):
+            self.driver = None
+
+        def is_alive(self):
+            return self.driver is not None
+
+        def warm_up(self):
+            self.acquire()
+
+        def acquire(self):
+            if self.driver is None:
+                self.driver = HttpDriver()
+            return self.driver
+
+        def quit(self):
+            self.driver = None
+
+    return HttpBrowserSession
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1048576 if sys.platform == 'darwin' else 1024), 1)  # Bytes on macOS, KB on Linux
+
+
+def run_once(args):
+    """Runs one batch in this (fresh) process against the server at args.server and prints a JSON result line."""
+    workdir = tempfile.mkdtemp(prefix='paper_downloader_bench_')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = workdir  # Fresh caches and library per run
+    os.chdir(workdir)
+    output = os.path.join(workdir, 'papers')
+    os.makedirs(output)
+    settings = {'paths': [output], 'last_selected': output, 'scholar_url': args.server,
+                'browser_headless': True, 'arxiv_fast_path': False,
+                'scholar_rate_per_minute': args.scholar_rate or 1e9, 'scholar_burst': 10 if args.scholar_rate else 10 ** 6,
+                'scholar_jitter': 0, 'scholar_block_backoff': 1, 'download_workers': args.workers,
+                'search_workers': args.search_workers, 'search_profile_quarantine': 5}
+    with open('downloader_settings.json', 'w') as f:
+        json.dump(settings, f)
+    with open('titles.txt', 'w') as f:
+        f.writelines(f'Benchmark paper {i}\n' for i in range(args.child))
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import paper_downloader as pd
+    pd.update_queue = TimedQueue()
+    if args.browser == 'http':
+        pd.BrowserSession = make_http_browser(pd)
+
+    stdout = sys.stdout
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull  # run_batch's per-event JSON lines stand in for the GUI's work
+        try:
+            exit_code = pd.run_batch('titles.txt', args.max_downloads, output, bypass_cache=True)
+        finally:
+            sys.stdout = stdout
+    elapsed = time.perf_counter() - started
+    latencies = pd.update_queue.latencies
+    stats = pd.pipeline_stats.snapshot()
+    print(json.dumps({
+        'titles': args.child, 'exit_code': exit_code, 'seconds': round(elapsed, 2),
+        'titles_per_min': round(args.child * 60 / elapsed, 1),
+        'mb_per_s': round(stats['bytes_total'] / 1048576 / elapsed, 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'gui_queue_p50_ms': round(percentile(latencies, 0.5) * 1000, 2) if latencies else None,
+        'gui_queue_p95_ms': round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        'gui_queue_max_ms': round(max(latencies) * 1000, 2) if latencies else None,
+        'stages': {name: {'count': span['count'], 'p50_ms': round(span['p50'] * 1000, 2),
+                          'p95_ms': round(span['p95'] * 1000, 2)} for name, span in stats['spans'].items()},
+        'http': stats['counters'].get('http'),
+    }), file=stdout, flush=True)
+    if not args.keep:
+        import shutil
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the download pipeline against a local Scholar and PDF-host stand-in.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000], metavar='N',
+                        help="batch sizes (titles) to run (default: 10 100 1000 10000)")
+    parser.add_argument('--max-downloads', type=int, default=1, metavar='N', help="PDFs per title (default: 1)")
+    parser.add_argument('--latency', type=float, default=0.0, metavar='SECONDS', help="delay before every response")
+    parser.add_argument('--pdf-size', type=int, default=64 * 1024, metavar='BYTES', help="size of each PDF (default: 64 KB)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of PDF requests that fail")
+    parser.add_argument('--captcha-rate', type=float, default=0.0, help="fraction of results pages that are CAPTCHAs")
+    parser.add_argument('--pdf-fraction', type=float, default=0.5, help="fraction of synthetic results with a PDF link")
+    parser.add_argument('--fixtures', metavar='DIR', help="serve the Scholar pages saved in DIR instead of synthetic ones")
+    parser.add_argument('--workers', type=int, default=4, help="download_workers setting (default: 4)")
+    parser.add_argument('--search-workers', type=int, default=1, help="search_workers setting (default: 1)")
+    parser.add_argument('--scholar-rate', type=float, default=0, metavar='PER_MIN',
+                        help="scholar_rate_per_minute setting (default: unlimited)")
+    parser.add_argument('--browser', choices=('http', 'chrome'), default='http',
+                        help="load results pages over plain HTTP (default) or with headless Chrome")
+    parser.add_argument('--output', metavar='FILE', help="also write the results as JSON to FILE")
+    parser.add_argument('--keep', action='store_true', help="keep each run's temporary folder")
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--server', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.child is not None:
+        run_once(args)
+        return 0
+
+    fixtures = sorted(glob.glob(os.path.join(args.fixtures, '*.html'))) if args.fixtures else None
+    server = BenchServer(latency=args.latency, pdf_size=args.pdf_size, error_rate=args.error_rate,
+                         captcha_rate=args.captcha_rate, pdf_fraction=args.pdf_fraction, fixtures=fixtures)
+    results = []
+    try:
+        print(f"{'Titles':>7}{'Seconds':>10}{'Titles/min':>12}{'MB/s':>9}{'Peak RSS MB':>13}{'Queue p95 ms':>14}")
+        for size in args.sizes:
+            command = [sys.executable, os.path.abspath(__file__), '--child', str(size), '--server', server.url,
+                       '--max-downloads', str(args.max_downloads), '--workers', str(args.workers),
+                       '--search-workers', str(args.search_workers),
+                       '--scholar-rate', str(args.scholar_rate), '--browser', args.browser]
+            if args.keep:
+                command.append('--keep')
+            run = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+            if run.returncode != 0 or not run.stdout.strip():
+                print(f"Run with {size} titles failed (exit code {run.returncode})", file=sys.stderr)
+                continue
+            result = json.loads(run.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{result['titles']:>7}{result['seconds']:>10}{result['titles_per_min']:>12}{result['mb_per_s']:>9}"
+                  f"{str(result['peak_rss_mb']):>13}{str(result['gui_queue_p95_ms']):>14}", flush=True)
+    finally:
+        server.close()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'settings': {key: value for key, value in vars(args).items() if key not in ('child', 'server')},
+                       'results': results}, f, indent=2)
+    return 0 if len(results) == len(args.sizes) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,37 +1,116 @@
+import time
+STARTUP_STARTED = time.perf_counter()
+
 import os
 import re
 import json
-import requests
-from bs4 import BeautifulSoup
-import tkinter as tk
-from tkinter import scrolledtext, messagebox, ttk, filedialog
 import threading
 import queue
-from urllib.parse import quote_plus
+import random
+import importlib
+from urllib.parse import quote_plus, urlparse, urljoin, parse_qs
+from collections import deque
 import subprocess
 import platform
 import sys
-import certifi
 import signal
 import atexit
-import arxiv
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+import argparse
+import sqlite3
+import hashlib
+import difflib
+import shutil
+from contextlib import contextmanager
+
+# --- Lazily Imported Dependencies ---
+# requests, bs4, selenium, webdriver_manager and arxiv add noticeably to cold
+# start (especially in the PyInstaller build), so they are only imported when
+# first used, or preloaded in the background once the window is up.
+IMPORT_TIMINGS = {}  # Module name -> seconds its import took
+_import_lock = threading.RLock()
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access, recording how long that took."""
+    def __init__(self, name, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            with _import_lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_load:
+                        self._on_load(module)
+                    IMPORT_TIMINGS[self._name] = time.perf_counter() - started
+                    self._module = module
+        return self._module
 
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
 
-# Set the SSL_CERT_FILE environment variable to the path provided by certifi.
-os.environ['SSL_CERT_FILE'] = certifi.where()
+def configure_requests(requests_module):
+    # Set the SSL_CERT_FILE environment variable to the path provided by certifi.
+    import certifi
+    os.environ['SSL_CERT_FILE'] = certifi.where()
+    # Suppress SSL verification warnings for a cleaner user experience
+    urllib3 = requests_module.packages.urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Suppress SSL verification warnings for a cleaner user experience
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
-requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+requests = LazyModule('requests', on_load=configure_requests)
+bs4 = LazyModule('bs4')
+lxml_html = LazyModule('lxml.html')
+arxiv = LazyModule('arxiv')
+webdriver = LazyModule('selenium.webdriver')
+selenium_by = LazyModule('selenium.webdriver.common.by')
+selenium_wait = LazyModule('selenium.webdriver.support.ui')
+EC = LazyModule('selenium.webdriver.support.expected_conditions')
+selenium_exceptions = LazyModule('selenium.common.exceptions')
+webdriver_manager_chrome = LazyModule('webdriver_manager.chrome')
+HEAVY_MODULES = (requests, lxml_html, webdriver, selenium_by, selenium_wait, EC, selenium_exceptions,
+                 webdriver_manager_chrome, arxiv)  # bs4 is only needed for --benchmark-parser
 
 SETTINGS_FILE = 'downloader_settings.json'
 PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".paper_downloader_profile")
+DRIVER_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".paper_downloader_driver.json")
+SEARCH_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".paper_downloader_cache.sqlite")
+LIBRARY_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".paper_downloader_library.sqlite")
+JOB_STORE_PATH = os.path.join(os.path.expanduser("~"), ".paper_downloader_jobs.sqlite")
+PROFILE_POOL_DIR = os.path.join(os.path.expanduser("~"), ".paper_downloader_profiles")
+STARTUP_LOG_PATH = os.path.join(os.path.expanduser("~"), ".paper_downloader_startup.jsonl")
+METRICS_LOG_PATH = os.path.join(os.path.expanduser("~"), ".paper_downloader_metrics.jsonl")
+
+# Defaults for optional settings; missing keys in SETTINGS_FILE fall back to these.
+DEFAULT_SETTINGS = {
+    'browser_max_pages': 50,  # Restart Chrome after this many page loads (0 = never)
+    'browser_headless': False,  # Run Chrome without a window (CAPTCHAs can't be solved by hand then)
+    'download_workers': 4,  # Concurrent PDF downloads
+    'downloads_per_host': 2,  # Concurrent PDF downloads from any single host
+    'download_backlog': 32,  # Found PDFs waiting for a download slot before the search stage pauses
+    'http_retries': 3,  # Retries for PDF fetches on connection errors, 429 and 5xx
+    'http_backoff': 0.5,  # Exponential backoff factor (seconds) between retries
+    'http_timeout': [10, 30],  # (connect, read) timeout in seconds
+    'http_host_timeouts': {},  # Per-host overrides, e.g. {"openreview.net": [10, 60]}
+    'search_cache_ttl_days': 30,  # Cached Scholar results older than this are searched again
+    'search_cache_max_entries': 5000,  # Least recently used queries beyond this are evicted
+    'arxiv_fast_path': True,  # Try the arXiv API before Scholar for single-download titles
+    'arxiv_batch_size': 10,  # Titles looked up per arXiv API request
+    'arxiv_match_threshold': 0.9,  # Minimum normalized-title similarity to accept an arXiv hit
+    'scholar_rate_per_minute': 6,  # Upper bound on sustained Scholar page loads
+    'scholar_burst': 2,  # Page loads allowed back-to-back before pacing kicks in
+    'scholar_jitter': 3.0,  # Extra random delay (seconds) before each page load
+    'scholar_block_backoff': 120,  # First pause (seconds) after a CAPTCHA; doubles on repeated blocks
+    'scholar_block_retries': 3,  # Times a blocked title is retried before it fails
+    'search_workers': 1,  # Parallel Chrome instances searching Scholar; re-read while running
+    'search_profile_quarantine': 600,  # Seconds a CAPTCHA'd browser sits out when other browsers can take over
+    'scholar_url': 'https://scholar.google.com/',  # Where searches go, e.g. a local stand-in for benchmark.py
+    'scholar_max_pages': 10,  # Results pages read per title while it still lacks enough PDFs
+    'metrics_log': False,  # Append every timing span to METRICS_LOG_PATH as a JSON line
+    'metrics_port': 0,  # Serve Prometheus-style metrics on http://127.0.0.1:<port>/metrics (0 = off)
+    'scholar_fixture_dir': '',  # Save each Scholar results page here, e.g. for --benchmark-parser ('' = off)
+}
 
 
 def sanitize_filename(filename):
@@ -55,94 +134,2030 @@ download_queue = queue.Queue()
 update_queue = queue.Queue()
 # FIX: Create a dedicated event for signaling shutdown
 shutdown_event = threading.Event()
+# Set once the first title is queued, so Chrome is started ahead of the first Scholar search
+browser_prewarm = threading.Event()
 
-def downloader_worker():
+class JobStore:
     """
-    This function runs in a separate thread.
-    It uses Selenium with a persistent profile to reduce CAPTCHAs.
+    Durable record of every queued title and its state (queued, searching,
+    downloading, done, failed), so unfinished work survives a crash or a
+    forced quit. Writes are buffered and flushed by a background thread in one
+    transaction every `flush_interval` seconds, keeping pipeline threads off
+    the disk. Until open() is called every method is a no-op.
     """
-    driver = None
-    while not shutdown_event.is_set():
+    def __init__(self, flush_interval=0.5):
+        self.flush_interval = flush_interval
+        self.conn = None
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._closed = threading.Event()
+
+    def open(self, path=JOB_STORE_PATH, keep_days=30):
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS jobs '
+                              '(title TEXT PRIMARY KEY, num_to_download INTEGER NOT NULL, download_path TEXT NOT NULL, '
+                              'bypass_cache INTEGER NOT NULL, state TEXT NOT NULL, attempts INTEGER NOT NULL, '
+                              'last_error TEXT, updated REAL NOT NULL)')
+            self.conn.execute("DELETE FROM jobs WHERE state IN ('done', 'failed') AND updated < ?",
+                              (time.time() - keep_days * 86400,))
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def _write(self, sql, params):
+        if self.conn is not None:
+            with self._pending_lock:
+                self._pending.append((sql, params))
+
+    def add(self, title_query, num_to_download, download_path, bypass_cache):
+        self._write('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, 0, NULL, ?)',
+                    (title_query, num_to_download, download_path, int(bypass_cache), 'queued', time.time()))
+
+    def update(self, title_query, state, error=None, new_attempt=False):
+        self._write('UPDATE jobs SET state = ?, last_error = ?, attempts = attempts + ?, updated = ? WHERE title = ?',
+                    (state, error, int(new_attempt), time.time(), title_query))
+
+    def flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending or self.conn is None:
+            return
+        with self._db_lock, self.conn:
+            for sql, params in pending:
+                self.conn.execute(sql, params)
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Job store write failed: {e}", file=sys.stderr)
+
+    def unfinished(self):
+        """Returns (title_query, num_to_download, download_path, bypass_cache) for every job not yet done or failed."""
+        if self.conn is None:
+            return []
+        self.flush()
+        with self._db_lock:
+            rows = self.conn.execute("SELECT title, num_to_download, download_path, bypass_cache FROM jobs "
+                                     "WHERE state NOT IN ('done', 'failed') ORDER BY rowid").fetchall()
+        return [(title, num, path, bool(bypass)) for title, num, path, bypass in rows]
+
+    def close(self):
+        if self.conn is None:
+            return
+        self._closed.set()
+        self.flush()
+        with self._db_lock:
+            self.conn.close()
+        self.conn = None
+
+job_store = JobStore()
+
+# --- Metrics ---
+class Metrics:
+    """
+    Timing spans from every pipeline stage (queue waits, browser acquire, page
+    load, parse, downloads, file writes). Each span is a dict with at least
+    'span', 'time' and 'seconds', handed to every registered sink; a sink is
+    any object with emit(span) and close().
+    """
+    def __init__(self):
+        self.sinks = []
+        self._waiting = {}  # (queue name, key) -> perf_counter() when queued
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+            sink.close()
+
+    def record(self, name, seconds, **fields):
+        span = {'span': name, 'time': round(time.time(), 3), 'seconds': round(seconds, 6), **fields}
+        for sink in list(self.sinks):
+            try:
+                sink.emit(span)
+            except Exception as e:
+                print(f"Metrics sink failed: {e}", file=sys.stderr)
+
+    @contextmanager
+    def span(self, name, **fields):
+        """Times the enclosed block; the yielded dict can be filled with extra fields before it ends."""
+        started = time.perf_counter()
         try:
-            # Use a timeout to periodically check the shutdown event
-            item = download_queue.get(timeout=1)
-            if item is None:
-                break
+            yield fields
+        finally:
+            self.record(name, time.perf_counter() - started, **fields)
 
-            title_query, num_to_download, download_path = item
-            
+    def queued(self, queue_name, key):
+        with self._lock:
+            self._waiting[(queue_name, key)] = time.perf_counter()
+
+    def dequeued(self, queue_name, key, span=None, **fields):
+        """Records a span (by default '<queue_name>_wait') for how long `key` sat in the queue."""
+        with self._lock:
+            started = self._waiting.pop((queue_name, key), None)
+        if started is not None:
+            self.record(span or f'{queue_name}_wait', time.perf_counter() - started, title=key, **fields)
+
+class JsonlSink:
+    """Appends spans to a JSON-lines file, flushing at most once a second."""
+    def __init__(self, path=METRICS_LOG_PATH, flush_interval=1.0):
+        self.file = open(path, 'a', encoding='utf-8')
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def emit(self, span):
+        line = json.dumps(span) + '\n'
+        with self.lock:
+            self.file.write(line)
+            now = time.monotonic()
+            if now - self.last_flush >= self.flush_interval:
+                self.last_flush = now
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+class StatsSink:
+    """
+    In-memory aggregate of recent spans for the stats panel and the metrics
+    endpoint: counts and totals since start, p50/p95 over the last `window`
+    spans of each kind, and download and title throughput over the last minute.
+    Components with their own counters (e.g. HttpClient) add them with watch().
+    """
+    def __init__(self, window=500):
+        self.window = window
+        self.lock = threading.Lock()
+        self.durations = {}  # Span name -> deque of recent durations
+        self.counts = {}
+        self.totals = {}  # Span name -> summed seconds
+        self.bytes_total = 0
+        self.recent_downloads = deque()  # (time, bytes) of downloads in the last minute
+        self.recent_titles = deque()  # Times titles finished in the last minute
+        self.counters = {}  # Name -> callable returning a dict of counts, read at each snapshot
+        self.started = time.monotonic()
+
+    def watch(self, name, read_counters):
+        """Includes `read_counters()` in every snapshot under 'counters'/`name`, replacing any earlier one."""
+        with self.lock:
+            self.counters[name] = read_counters
+
+    def emit(self, span):
+        name = span['span']
+        with self.lock:
+            self.durations.setdefault(name, deque(maxlen=self.window)).append(span['seconds'])
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.totals[name] = self.totals.get(name, 0) + span['seconds']
+            if name == 'download' and span.get('bytes'):
+                self.bytes_total += span['bytes']
+                self.recent_downloads.append((time.monotonic(), span['bytes']))
+            elif name == 'title':
+                self.recent_titles.append(time.monotonic())
+
+    def snapshot(self):
+        """{'spans': {name: {'count', 'total', 'p50', 'p95'}}, 'counters', 'bytes_total', 'bytes_per_second', 'titles_per_minute'}"""
+        now = time.monotonic()
+        with self.lock:
+            while self.recent_downloads and now - self.recent_downloads[0][0] > 60:
+                self.recent_downloads.popleft()
+            while self.recent_titles and now - self.recent_titles[0] > 60:
+                self.recent_titles.popleft()
+            spans = {}
+            for name, durations in self.durations.items():
+                ordered = sorted(durations)
+                spans[name] = {'count': self.counts[name], 'total': self.totals[name],
+                               'p50': percentile(ordered, 0.5), 'p95': percentile(ordered, 0.95)}
+            counters = dict(self.counters)
+            elapsed = max(1e-9, min(60, now - self.started))
+            return {'spans': spans, 'counters': {name: read() for name, read in counters.items()},
+                    'bytes_total': self.bytes_total,
+                    'bytes_per_second': sum(size for _, size in self.recent_downloads) / elapsed,
+                    'titles_per_minute': len(self.recent_titles) * 60 / elapsed}
+
+    def close(self):
+        pass
+
+def prometheus_text(snapshot):
+    """Renders a StatsSink snapshot in the Prometheus text exposition format."""
+    lines = ['# TYPE paper_downloader_span_seconds summary']
+    for name, stats in sorted(snapshot['spans'].items()):
+        for quantile in ('p50', 'p95'):
+            if stats[quantile] is not None:
+                lines.append(f'paper_downloader_span_seconds{{span="{name}",quantile="0.{quantile[1:]}"}} {stats[quantile]}')
+        lines.append(f'paper_downloader_span_seconds_sum{{span="{name}"}} {stats["total"]}')
+        lines.append(f'paper_downloader_span_seconds_count{{span="{name}"}} {stats["count"]}')
+    lines += ['# TYPE paper_downloader_download_bytes_total counter',
+              f'paper_downloader_download_bytes_total {snapshot["bytes_total"]}',
+              '# TYPE paper_downloader_download_bytes_per_second gauge',
+              f'paper_downloader_download_bytes_per_second {snapshot["bytes_per_second"]:.1f}']
+    for name, counts in sorted(snapshot['counters'].items()):
+        for key, value in sorted(counts.items()):
+            lines += [f'# TYPE paper_downloader_{name}_{key}_total counter', f'paper_downloader_{name}_{key}_total {value}']
+    return '\n'.join(lines) + '\n'
+
+STATS_PANEL_SPANS = ('queue_wait', 'cache_lookup', 'arxiv_lookup', 'search_queue_wait', 'rate_limit_wait',
+                     'browser_acquire', 'page_load', 'captcha_wait', 'parse', 'download', 'file_write', 'title')
+
+def format_pipeline_stats(snapshot):
+    """Renders a StatsSink snapshot as the fixed-width table of the in-app stats panel."""
+    lines = [f"Throughput: {snapshot['bytes_per_second'] / 1048576:.2f} MB/s · "
+             f"{snapshot['titles_per_minute']:.1f} titles/min",
+             f"{'Stage':<18}{'Count':>7}{'p50':>10}{'p95':>10}"]
+    for name in STATS_PANEL_SPANS:
+        stats = snapshot['spans'].get(name)
+        if stats:
+            lines.append(f"{name:<18}{stats['count']:>7}{format_latency(stats['p50']):>10}{format_latency(stats['p95']):>10}")
+    http = snapshot['counters'].get('http')
+    if http:
+        lines.append(f"HTTP: {http['requests']} requests, {http['reused']} on reused connections, {http['retries']} retries")
+    return '\n'.join(lines)
+
+class MetricsEndpoint:
+    """Serves `stats` as Prometheus-style text on http://127.0.0.1:<port>/metrics from a daemon thread."""
+    def __init__(self, stats, port):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Only needed when metrics_port is set
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = prometheus_text(stats.snapshot()).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of stderr
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+metrics = Metrics()
+pipeline_stats = StatsSink()
+metrics.add_sink(pipeline_stats)
+
+def open_metrics_outputs(settings):
+    """Attaches the JSONL log and starts the metrics endpoint when settings enable them. Returns the objects to close."""
+    outputs = []
+    try:
+        if settings['metrics_log']:
+            outputs.append(JsonlSink())
+            metrics.add_sink(outputs[-1])
+        if settings['metrics_port']:
+            outputs.append(MetricsEndpoint(pipeline_stats, settings['metrics_port']))
+    except OSError as e:
+        print(f"Could not start metrics output: {e}", file=sys.stderr)
+    return outputs
+
+def close_metrics_outputs(outputs):
+    for output in outputs:
+        if output in metrics.sinks:
+            metrics.remove_sink(output)
+        else:
+            output.close()
+
+def queue_title(title_query, num_to_download, download_path, bypass_cache):
+    """Puts a title on download_queue, starting its queue-wait and end-to-end 'title' timers."""
+    metrics.queued('queue', title_query)
+    metrics.queued('title', title_query)
+    download_queue.put((title_query, num_to_download, download_path, bypass_cache))
+
+_driver_path_lock = threading.Lock()  # Search workers may start Chrome at the same time
+
+def get_chromedriver_path(refresh=False):
+    """
+    Returns the chromedriver path, reusing the one resolved on a previous launch
+    so ChromeDriverManager's version lookup only runs when the cache is stale.
+    """
+    with _driver_path_lock:
+        if not refresh:
             try:
-                update_queue.put(('update_status', title_query, 'Opening browser...'))
-                
-                options = webdriver.ChromeOptions()
-                options.add_argument(f"user-data-dir={PROFILE_PATH}")
-                
-                driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-                
-                search_query = f'{title_query} + paper'
-                search_url = f"https://scholar.google.com/scholar?hl=en&q={quote_plus(search_query)}"
-                driver.get(search_url)
+                with open(DRIVER_CACHE_FILE, 'r') as f:
+                    cached_path = json.load(f).get('path')
+                if cached_path and os.path.isfile(cached_path):
+                    return cached_path
+            except (OSError, ValueError, AttributeError):
+                pass
 
-                WebDriverWait(driver, 300).until(
-                    EC.presence_of_element_located((By.ID, "gs_res_ccl_mid"))
-                )
-                
-                update_queue.put(('update_status', title_query, 'Searching...'))
-                html = driver.page_source
-                soup = BeautifulSoup(html, 'lxml')
-                
-                results = soup.find_all('div', class_='gs_scl')
-                
-                if not results:
-                    update_queue.put(('update_status', title_query, 'Error: Not Found'))
+        driver_path = webdriver_manager_chrome.ChromeDriverManager().install()
+        try:
+            with open(DRIVER_CACHE_FILE, 'w') as f:
+                json.dump({'path': driver_path}, f)
+        except OSError:
+            pass  # Caching is an optimization only
+        return driver_path
+
+class BrowserSession:
+    """
+    A long-lived Chrome instance shared by every queued title.
+    Chrome is started lazily on first use, health-checked before each page and
+    restarted only if it crashed or has served `max_pages` pages.
+    """
+    def __init__(self, profile_path=PROFILE_PATH, max_pages=0, headless=False):
+        self.profile_path = profile_path
+        self.max_pages = max_pages
+        self.headless = headless
+        self.driver = None
+        self.pages_served = 0
+
+    def _start(self):
+        options = webdriver.ChromeOptions()
+        options.add_argument(f"user-data-dir={self.profile_path}")
+        if self.headless:
+            options.add_argument("--headless=new")
+        try:
+            self.driver = webdriver.Chrome(service=webdriver.ChromeService(get_chromedriver_path()), options=options)
+        except selenium_exceptions.WebDriverException:
+            # The cached driver may no longer match an updated Chrome; resolve it again once.
+            self.driver = webdriver.Chrome(service=webdriver.ChromeService(get_chromedriver_path(refresh=True)), options=options)
+        self.pages_served = 0
+
+    def is_alive(self):
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_window_handle  # Raises if Chrome or its window is gone
+            return True
+        except selenium_exceptions.WebDriverException:
+            return False
+
+    def warm_up(self):
+        """Starts Chrome ahead of the first search, so that search doesn't pay for the launch."""
+        if not self.is_alive():
+            self.quit()
+            self._start()
+
+    def acquire(self):
+        """Returns a healthy driver, (re)starting Chrome only when needed."""
+        if self.max_pages and self.pages_served >= self.max_pages:
+            self.quit()
+        if not self.is_alive():
+            self.quit()
+            self._start()
+        self.pages_served += 1
+        return self.driver
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass  # Chrome may already be dead
+            self.driver = None
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+MAX_RETRY_AFTER = 60  # Never sleep longer than this on a server's Retry-After
+
+class HttpClient:
+    """
+    Shared, thread-safe HTTP layer for PDF fetches.
+    Each thread gets its own requests.Session (Sessions aren't thread-safe), but
+    all of them are mounted on one HTTPAdapter, so keep-alive connections are
+    pooled per host across every download thread. Connection errors, 429 and
+    5xx responses are retried with exponential backoff, honouring Retry-After.
+    """
+    def __init__(self, retries=3, backoff=0.5, timeout=(10, 30), host_timeouts=None, pool_size=4):
+        client = self
+        class ClientRetry(requests.packages.urllib3.util.retry.Retry):
+            """Retry policy that caps Retry-After and reports each retry to this client."""
+            def get_retry_after(self, response):
+                retry_after = super().get_retry_after(response)
+                return None if retry_after is None else min(retry_after, MAX_RETRY_AFTER)
+
+            def increment(self, *args, **kwargs):
+                new_retry = super().increment(*args, **kwargs)  # Raises once retries are exhausted
+                client.record_retry()
+                return new_retry
+
+        self.retry = ClientRetry(total=retries, backoff_factor=backoff,
+                                 status_forcelist=(429, 500, 502, 503, 504),
+                                 allowed_methods=frozenset({'GET', 'HEAD'}),
+                                 respect_retry_after_header=True, raise_on_status=False)
+        self.adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=max(1, pool_size), max_retries=self.retry)
+        self.timeout = tuple(timeout)
+        self.host_timeouts = {host.lower(): tuple(t) for host, t in (host_timeouts or {}).items()}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.retries = 0
+        self._closed_requests = 0
+        self._closed_connections = 0
+        # Keep the counters of per-host pools that get evicted from the adapter
+        pools = self.adapter.poolmanager.pools
+        dispose_pool = pools.dispose_func
+        def retire_pool(pool):
+            with self._lock:
+                self._closed_requests += pool.num_requests
+                self._closed_connections += pool.num_connections
+            if dispose_pool:
+                dispose_pool(pool)
+        pools.dispose_func = retire_pool
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+        return session
+
+    def timeout_for(self, url):
+        host = urlparse(url).hostname or ''
+        while host:
+            if host in self.host_timeouts:
+                return self.host_timeouts[host]
+            host = host.partition('.')[2]  # Let "openreview.net" match "api.openreview.net"
+        return self.timeout
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout_for(url))
+        kwargs.setdefault('verify', False)
+        return self._session().get(url, **kwargs)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def stats(self):
+        """Returns request, connection, connection-reuse and retry counts so far."""
+        with self._lock:
+            requests_made, connections = self._closed_requests, self._closed_connections
+            retries = self.retries
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_made += pool.num_requests
+                connections += pool.num_connections
+        return {'requests': requests_made, 'connections': connections,
+                'reused': max(0, requests_made - connections), 'retries': retries}
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PROGRESS_INTERVAL = 0.5  # Seconds between byte-progress updates per download
+
+def format_progress(received, total=None):
+    """Formats byte progress for the status column, e.g. '1.2/5.0 MB'."""
+    if total:
+        return f"{received / 1048576:.1f}/{total / 1048576:.1f} MB"
+    return f"{received / 1048576:.1f} MB"
+
+MIN_PDF_SIZE = 1024  # Anything smaller is an error page or a truncated file, not a paper
+NON_PDF_TYPES = ('text/html', 'application/xhtml+xml', 'application/json', 'text/plain')
+
+def is_pdf_start(data):
+    """True if `data` (the first bytes of a file) carries the %PDF header, which may sit anywhere in the first 1 KB."""
+    return b'%PDF-' in data[:1024]
+
+def pdf_looks_complete(path, expected_size=None):
+    """
+    A cheap integrity check for a downloaded PDF: the %PDF header, a %%EOF
+    marker near the end, a plausible size, and the size the server announced.
+    """
+    try:
+        size = os.path.getsize(path)
+        if size < MIN_PDF_SIZE or (expected_size and size != expected_size):
+            return False
+        with open(path, 'rb') as f:
+            head = f.read(1024)
+            f.seek(max(0, size - 2048))
+            tail = f.read()
+        return is_pdf_start(head) and b'%%EOF' in tail
+    except OSError:
+        return False
+
+def load_part_info(part_path, pdf_link):
+    """Returns the validators saved for a resumable .part file, or None if it can't be resumed."""
+    try:
+        with open(part_path + '.json', 'r') as f:
+            info = json.load(f)
+        if info.get('url') == pdf_link and os.path.getsize(part_path) > 0:
+            return info
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+def download_pdf(http, pdf_link, filepath, sub_task_id):
+    """
+    Streams one PDF to `filepath`.part in chunks and renames it into place once
+    complete, so a killed process never leaves a truncated PDF behind.
+    An interrupted .part from the same URL is resumed with an HTTP Range
+    request when the server supports it. Responses that aren't PDFs (by
+    Content-Type or the %PDF header of the first chunk) are abandoned before
+    the body is read, and a finished file must pass pdf_looks_complete.
+    Returns True on success, and records a 'download' span (bytes, host,
+    throughput) plus a 'file_write' span for a completed file.
+    """
+    started = time.perf_counter()
+    span = {'title': sub_task_id[0], 'host': urlparse(pdf_link).netloc.lower(), 'bytes': 0}
+    ok = False
+    try:
+        ok = _stream_pdf(http, pdf_link, filepath, sub_task_id, span)
+    finally:
+        seconds = time.perf_counter() - started
+        metrics.record('download', seconds, ok=ok, bytes_per_second=round(span['bytes'] / max(seconds, 1e-6)), **span)
+    return ok
+
+def _stream_pdf(http, pdf_link, filepath, sub_task_id, span):
+    write_seconds = 0
+    part_path = filepath + '.part'
+    headers = {}
+    resume_from = 0
+    part_info = load_part_info(part_path, pdf_link)
+    if part_info:
+        resume_from = os.path.getsize(part_path)
+        headers['Range'] = f'bytes={resume_from}-'
+        # If-Range makes the server send the whole file instead if it changed since
+        validator = part_info.get('etag') or part_info.get('last_modified')
+        if validator:
+            headers['If-Range'] = validator
+
+    update_queue.put(('update_status', sub_task_id, 'Downloading...'))
+    try:
+        with http.get(pdf_link, headers=headers, stream=True) as pdf_response:
+            chunks = pdf_response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            if resume_from and pdf_response.status_code == 206:
+                mode = 'ab'
+                first_chunk = next(chunks, b'')
+            else:
+                if pdf_response.status_code == 416:
+                    os.remove(part_path)  # Stale .part; start over on the next attempt
+                pdf_response.raise_for_status()
+                # Paywalls, interstitials and CAPTCHA pages are HTML: give up before reading the body
+                content_type = pdf_response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type in NON_PDF_TYPES:
+                    update_queue.put(('update_status', sub_task_id, 'Error: Not a PDF'))
+                    return False
+                first_chunk = next(chunks, b'')
+                if not is_pdf_start(first_chunk):
+                    update_queue.put(('update_status', sub_task_id, 'Error: Not a PDF'))
+                    return False
+                mode, resume_from = 'wb', 0
+                with open(part_path + '.json', 'w') as f:
+                    json.dump({'url': pdf_link,
+                               'etag': pdf_response.headers.get('ETag'),
+                               'last_modified': pdf_response.headers.get('Last-Modified')}, f)
+
+            content_length = pdf_response.headers.get('Content-Length')
+            total = resume_from + int(content_length) if content_length and content_length.isdigit() else None
+            # Content-Length counts encoded bytes, so it can only be checked against unencoded bodies
+            expected_size = None if pdf_response.headers.get('Content-Encoding') else total
+            received = resume_from
+            last_report = 0
+            with open(part_path, mode) as f:
+                f.write(first_chunk)
+                received += len(first_chunk)
+                span['bytes'] += len(first_chunk)
+                for chunk in chunks:
+                    if shutdown_event.is_set():
+                        return False  # Keep the .part file so the transfer can resume
+                    write_started = time.perf_counter()
+                    f.write(chunk)
+                    write_seconds += time.perf_counter() - write_started
+                    received += len(chunk)
+                    span['bytes'] += len(chunk)
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        update_queue.put(('update_status', sub_task_id, format_progress(received, total)))
+
+        finishing = time.perf_counter()
+        if not pdf_looks_complete(part_path, expected_size):
+            # Truncated or damaged: drop it so it neither counts as downloaded nor gets resumed
+            for path in (part_path, part_path + '.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            update_queue.put(('update_status', sub_task_id, 'Error: Incomplete PDF'))
+            return False
+        os.replace(part_path, filepath)
+        try:
+            os.remove(part_path + '.json')
+        except OSError:
+            pass
+        metrics.record('file_write', write_seconds + time.perf_counter() - finishing,
+                       title=sub_task_id[0], bytes=received)
+        update_queue.put(('update_status', sub_task_id, 'Complete'))
+        return True
+    except (requests.RequestException, OSError) as e:
+        print(f"Failed to download {pdf_link}: {e}", file=sys.stderr)
+        update_queue.put(('update_status', sub_task_id, 'Error: Failed'))
+        return False
+
+def paper_identifier(url):
+    """Returns a source-independent identifier ('arxiv:…', 'doi:…', 'openreview:…') for a PDF URL, or None."""
+    match = re.search(r'arxiv\.org/(?:abs|pdf)/([a-z\-]+(?:\.[A-Z]{2})?/\d{7}|\d{4}\.\d{4,5})', url, re.IGNORECASE)
+    if match:
+        return f"arxiv:{match.group(1).lower()}"
+    match = re.search(r'openreview\.net/(?:pdf|forum)\?id=([\w\-]+)', url)
+    if match:
+        return f"openreview:{match.group(1)}"
+    match = re.search(r'(10\.\d{4,9}/[^\s?#&]+)', url)
+    if match:
+        doi = re.sub(r'(\.pdf|/pdf|/full)$', '', match.group(1), flags=re.IGNORECASE)
+        return f"doi:{doi.lower()}"
+    return None
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def link_or_copy(src, dst):
+    """Hardlinks `src` to `dst`, copying when hardlinks aren't possible (e.g. across volumes)."""
+    tmp_path = dst + '.link'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+def unique_path(filepath, taken=None):
+    """
+    Returns `filepath`, or 'name (2).pdf', 'name (3).pdf', … if it is already
+    taken on disk or by the optional `taken(path)` check.
+    """
+    stem, ext = os.path.splitext(filepath)
+    candidate, n = filepath, 1
+    while os.path.exists(candidate) or os.path.exists(candidate + '.part') or (taken and taken(candidate)):
+        n += 1
+        candidate = f"{stem} ({n}){ext}"
+    return candidate
+
+class LibraryIndex:
+    """
+    Content-addressed index of every downloaded PDF, shared by all download
+    threads. `sources` maps a URL (and its DOI/arXiv identifier) to the SHA-256
+    of the file it produced, and `files` maps each SHA-256 to the paths holding
+    that content, so a known paper is linked or skipped instead of refetched.
+    """
+    def __init__(self, path=LIBRARY_INDEX_PATH):
+        self.lock = threading.Lock()
+        self._in_flight = {}
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS files '
+                              '(path TEXT PRIMARY KEY, sha256 TEXT NOT NULL, size INTEGER NOT NULL, added REAL NOT NULL)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS sources '
+                              '(url TEXT PRIMARY KEY, identifier TEXT, sha256 TEXT NOT NULL, added REAL NOT NULL)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS sources_identifier ON sources (identifier)')
+
+    @contextmanager
+    def claim(self, url, identifier, path):
+        """
+        Serializes work on one paper and one target file, so two threads never
+        fetch the same URL or identifier, or write the same path, at once.
+        Yields a function that picks a free name for `path` (see unique_path),
+        counting paths claimed by other threads as taken, and claims it too.
+        """
+        keys = [key for key in (url, identifier, os.path.normcase(path)) if key]
+        while True:
+            with self.lock:
+                busy = [self._in_flight[key] for key in keys if key in self._in_flight]
+                if not busy:
+                    done = threading.Event()
+                    for key in keys:
+                        self._in_flight[key] = done
+                    break
+            busy[0].wait()
+
+        def claim_free_path(filepath):
+            with self.lock:
+                filepath = unique_path(filepath, taken=lambda candidate: os.path.normcase(candidate) in self._in_flight)
+                keys.append(os.path.normcase(filepath))
+                self._in_flight[keys[-1]] = done
+            return filepath
+
+        try:
+            yield claim_free_path
+        finally:
+            with self.lock:
+                for key in keys:
+                    self._in_flight.pop(key, None)
+            done.set()
+
+    def lookup(self, url, identifier):
+        """Returns the SHA-256 previously downloaded from this URL or identifier, or None."""
+        with self.lock:
+            row = self.conn.execute('SELECT sha256 FROM sources WHERE url = ? OR identifier = ? LIMIT 1',
+                                    (url, identifier)).fetchone()
+        return row[0] if row else None
+
+    def paths_for(self, sha256):
+        """Returns the paths still holding this content, forgetting ones that were deleted or changed."""
+        with self.lock:
+            rows = self.conn.execute('SELECT path, size FROM files WHERE sha256 = ?', (sha256,)).fetchall()
+        paths, stale = [], []
+        for path, size in rows:
+            if os.path.isfile(path) and os.path.getsize(path) == size:
+                paths.append(path)
+            else:
+                stale.append((path,))
+        if stale:
+            with self.lock, self.conn:
+                self.conn.executemany('DELETE FROM files WHERE path = ?', stale)
+        return paths
+
+    def knows_path(self, path):
+        with self.lock:
+            return self.conn.execute('SELECT 1 FROM files WHERE path = ?', (path,)).fetchone() is not None
+
+    def add_file(self, path, url=None, identifier=None, sha256=None):
+        """Records `path` (and the URL it came from, if any). Returns its SHA-256."""
+        sha256 = sha256 or file_sha256(path)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                              (path, sha256, os.path.getsize(path), now))
+            if url:
+                self.conn.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)',
+                                  (url, identifier, sha256, now))
+        return sha256
+
+    def remove_file(self, path):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM files WHERE path = ?', (path,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class DownloadPool:
+    """
+    The download stage: a fixed set of threads consuming (pdf_link, filepath,
+    sub_task_id) jobs from a bounded queue. A full queue blocks the search stage
+    (back-pressure), and each host gets at most `per_host` concurrent transfers.
+    A job whose host is saturated is set aside rather than waited on, so its
+    thread moves on to other hosts; set-aside jobs run as soon as a slot frees.
+    """
+    def __init__(self, http, library, workers=4, per_host=2, backlog=32):
+        self.http = http
+        self.library = library
+        self.jobs = queue.Queue(maxsize=max(1, backlog))
+        self.per_host = max(1, per_host)
+        self._host_slots = {}
+        self._deferred = {}  # host -> deque of jobs waiting for a free slot
+        self._max_deferred = max(1, backlog)
+        self._host_lock = threading.Lock()
+        self.threads = []
+        for _ in range(max(1, workers)):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, pdf_link, filepath, sub_task_id, on_done=None):
+        """
+        Queues a download, blocking while the backlog is full.
+        `on_done(ok)` is called from the download thread and may return another
+        job tuple, which the same thread then downloads in its place.
+        """
+        job = (pdf_link, filepath, sub_task_id, on_done)
+        while not shutdown_event.is_set():
+            try:
+                self.jobs.put(job, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch(self, pdf_link, filepath, sub_task_id):
+        """
+        Downloads one PDF unless the library already has it: a paper already in
+        the target folder is skipped, and one stored elsewhere is hardlinked.
+        Returns True if the PDF is now available in the target folder.
+        """
+        filepath = os.path.abspath(filepath)
+        identifier = paper_identifier(pdf_link)
+        folder = os.path.dirname(filepath)
+        with self.library.claim(pdf_link, identifier, filepath) as claim_free_path:
+            known_sha256 = self.library.lookup(pdf_link, identifier)
+            existing = self.library.paths_for(known_sha256) if known_sha256 else []
+            if any(os.path.dirname(os.path.abspath(path)) == folder for path in existing):
+                update_queue.put(('update_status', sub_task_id, 'Already downloaded'))
+                return True
+
+            if os.path.exists(filepath):
+                # Never overwrite an unrelated file of the same name; index it so duplicates are detected
+                if not self.library.knows_path(filepath) and self.library.add_file(filepath) == known_sha256:
+                    update_queue.put(('update_status', sub_task_id, 'Already downloaded'))
+                    return True
+                filepath = claim_free_path(filepath)
+
+            if existing:
+                link_or_copy(existing[0], filepath)
+                self.library.add_file(filepath, pdf_link, identifier, sha256=known_sha256)
+                update_queue.put(('update_status', sub_task_id, 'Linked from library'))
+                return True
+
+            if not download_pdf(self.http, pdf_link, filepath, sub_task_id):
+                return False
+            sha256 = self.library.add_file(filepath, pdf_link, identifier)
+            duplicates = [path for path in self.library.paths_for(sha256) if path != filepath]
+            if any(os.path.dirname(os.path.abspath(path)) == folder for path in duplicates):
+                # Same content under another name in this folder: keep only the original
+                os.remove(filepath)
+                self.library.remove_file(filepath)
+                update_queue.put(('update_status', sub_task_id, 'Already downloaded'))
+            elif duplicates:
+                link_or_copy(duplicates[0], filepath)  # Share storage with the copy in another folder
+            return True
+
+    def _host_slot(self, host):
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _claim_slot(self, job):
+        """
+        Takes a transfer slot for the job's host and returns it, or sets the job
+        aside and returns None if the host is saturated. Once too many jobs are
+        set aside, waits for the slot instead so memory stays bounded.
+        """
+        host = urlparse(job[0]).netloc.lower()
+        slot = self._host_slot(host)
+        if slot.acquire(blocking=False):
+            return slot
+        with self._host_lock:
+            if sum(map(len, self._deferred.values())) < self._max_deferred:
+                self._deferred.setdefault(host, deque()).append(job)
+                return None
+        while not slot.acquire(timeout=1):
+            if shutdown_event.is_set():
+                return None
+        return slot
+
+    def _take_deferred(self):
+        """Returns a set-aside job whose host now has a free slot, with that slot, or (None, None)."""
+        with self._host_lock:
+            for host, jobs in self._deferred.items():
+                slot = self._host_slots[host]
+                if jobs and slot.acquire(blocking=False):
+                    job = jobs.popleft()
+                    if not jobs:
+                        del self._deferred[host]
+                    return job, slot
+        return None, None
+
+    def _run(self):
+        while not shutdown_event.is_set():
+            job, slot = self._take_deferred()
+            if job is None:
+                try:
+                    job = self.jobs.get(timeout=0.1 if self._deferred else 1)
+                except queue.Empty:
                     continue
+                self.jobs.task_done()
+                if job is None:
+                    break
+            try:
+                while job and not shutdown_event.is_set():
+                    slot = slot or self._claim_slot(job)
+                    if slot is None:
+                        break  # Set aside until its host frees up
+                    pdf_link, filepath, sub_task_id, on_done = job
+                    try:
+                        ok = self.fetch(pdf_link, filepath, sub_task_id)
+                    except Exception as e:
+                        print(f"Failed to download {pdf_link}: {e}", file=sys.stderr)
+                        update_queue.put(('update_status', sub_task_id, 'Error: Failed'))
+                        ok = False
+                    finally:
+                        slot.release()
+                        slot = None
+                    next_job = on_done(ok) if on_done else None
+                    job = (*next_job, on_done) if next_job else None
+            except Exception as e:
+                print(f"Download worker error: {e}", file=sys.stderr)
+            finally:
+                if slot:
+                    slot.release()
 
-                update_queue.put(('update_status', title_query, f'Found {len(results)} results'))
-                
-                downloaded_count = 0
-                for i, result in enumerate(results):
-                    if downloaded_count >= num_to_download:
-                        break
-
-                    pdf_section = result.find('div', class_='gs_ggsd')
-                    if pdf_section and pdf_section.find('a'):
-                        pdf_link = pdf_section.find('a')['href']
-                        paper_title_tag = result.find('h3', class_='gs_rt')
-                        paper_title = paper_title_tag.text if paper_title_tag else title_query
-                        
-                        sub_task_id = f"{title_query}_{i+1}"
-                        filename = f"{sanitize_filename(paper_title)}.pdf"
-                        filepath = os.path.join(download_path, filename)
-                        
-                        update_queue.put(('add_sub_task', sub_task_id, (filename, 'Downloading...')))
-                        
-                        try:
-                            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-                            pdf_response = requests.get(pdf_link, headers=headers, timeout=30, verify=False)
-                            pdf_response.raise_for_status()
-                            with open(filepath, 'wb') as f:
-                                f.write(pdf_response.content)
-                            update_queue.put(('update_status', sub_task_id, 'Complete'))
-                            downloaded_count += 1
-                        except requests.RequestException as e:
-                            print(f"Failed to download {pdf_link}: {e}")
-                            update_queue.put(('update_status', sub_task_id, 'Error: Failed'))
-
-                final_status = f'Complete ({downloaded_count}/{num_to_download})'
-                update_queue.put(('update_status', title_query, final_status))
-                update_queue.put(('add_separator', title_query, None))
+    def shutdown(self, timeout=2):
+        for _ in self.threads:
+            try:
+                self.jobs.put_nowait(None)
+            except queue.Full:
+                break  # Workers still exit via shutdown_event
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(max(0, deadline - time.monotonic()))
+
+def finish_title(title_query, downloaded, num_to_download, error=None):
+    """Records a title's outcome and emits its terminal 'title_done' event."""
+    metrics.dequeued('title', title_query, span='title', downloaded=downloaded, requested=num_to_download)
+    if downloaded:
+        job_store.update(title_query, 'done')
+    else:
+        job_store.update(title_query, 'failed', error or 'No PDF downloaded')
+    result = {'downloaded': downloaded, 'requested': num_to_download}
+    if error:
+        result['error'] = error
+    update_queue.put(('title_done', title_query, result))
+
+class TitleJob:
+    """
+    Tracks one queued title across the search and download stages.
+    Found PDFs are handed out up to `num_to_download` at a time; a failed
+    download is replaced by the next candidate, and the title's final status is
+    reported once searching has finished and every download has settled.
+    Searching can pause while enough candidates are queued and resume if
+    their downloads fail (see pause_search).
+    """
+    def __init__(self, title_query, num_to_download, download_path):
+        self.title_query = title_query
+        self.num_to_download = num_to_download
+        self.download_path = download_path
+        self.candidates = deque()
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.downloaded = 0
+        self.submitted = 0
+        self.search_done = False
+        self.finished = False
+        self.resume = None
+
+    def add_candidate(self, pdf_link, name):
+        with self.lock:
+            self.candidates.append((pdf_link, name))
+
+    def add_results(self, pool, results):
+        """Queues the PDFs among a page of search results and submits the downloads still needed."""
+        for result in rank_results(self.title_query, results):
+            if result['pdf_link']:
+                self.add_candidate(result['pdf_link'], result_filename(result))
+        for pdf_link, filepath, sub_task_id in self.take_jobs():
+            pool.submit(pdf_link, filepath, sub_task_id, on_done=self.download_done)
+
+    def needs_more(self):
+        """True while the downloaded, in-flight and waiting PDFs together fall short of `num_to_download`."""
+        with self.lock:
+            return self.downloaded + self.pending + len(self.candidates) < self.num_to_download
+
+    def _next_job(self):
+        # Caller holds self.lock
+        if not self.candidates or self.downloaded + self.pending >= self.num_to_download:
+            return None
+        pdf_link, name = self.candidates.popleft()
+        self.pending += 1
+        self.submitted += 1
+        sub_task_id = (self.title_query, self.submitted)
+        filename = f"{sanitize_filename(name)}.pdf"
+        update_queue.put(('add_sub_task', sub_task_id, (filename, 'Queued')))
+        return pdf_link, os.path.join(self.download_path, filename), sub_task_id
+
+    def take_jobs(self):
+        """Reserves and returns as many download jobs as are still needed."""
+        jobs = []
+        with self.lock:
+            job = self._next_job()
+            while job:
+                jobs.append(job)
+                job = self._next_job()
+        return jobs
+
+    def download_done(self, ok):
+        with self.lock:
+            self.pending -= 1
+            if ok:
+                self.downloaded += 1
+            next_job = self._next_job()
+        self._check_resume()
+        self._maybe_finish()
+        return next_job
+
+    def pause_search(self, resume):
+        """
+        Stops paging while the PDFs found so far download. Then calls
+        `resume(True)` if failures leave the title short of candidates again,
+        or `resume(False)` once its downloads have settled.
+        """
+        with self.lock:
+            self.resume = resume
+        self._check_resume()
+
+    def _check_resume(self):
+        with self.lock:
+            if self.resume is None:
+                return
+            short = self.downloaded + self.pending + len(self.candidates) < self.num_to_download
+            if not short and self.pending:
+                return
+            resume, self.resume = self.resume, None
+        resume(short)
 
+    def finish_search(self):
+        with self.lock:
+            self.search_done = True
+        self._maybe_finish()
+
+    def _maybe_finish(self):
+        with self.lock:
+            if self.finished or not self.search_done or self.pending:
+                return
+            self.finished = True
+        final_status = f'Complete ({self.downloaded}/{self.num_to_download})'
+        update_queue.put(('update_status', self.title_query, final_status))
+        update_queue.put(('add_separator', self.title_query, None))
+        finish_title(self.title_query, self.downloaded, self.num_to_download)
+
+def normalize_query(query):
+    """Case-folds a query and collapses punctuation and whitespace, so trivially different titles share a cache entry."""
+    return ' '.join(re.sub(r'[\W_]+', ' ', query.casefold()).split())
+
+class SearchCache:
+    """
+    On-disk cache of parsed Scholar results, keyed by normalized query.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted beyond `max_entries`, so repeat queries skip the browser entirely.
+    """
+    def __init__(self, path=SEARCH_CACHE_PATH, ttl=30 * 86400, max_entries=5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS search_cache '
+                              '(query TEXT PRIMARY KEY, results TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)')
+
+    def get(self, query):
+        """Returns the cached result list for `query`, or None on a miss."""
+        key = normalize_query(query)
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT results, created FROM search_cache WHERE query = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self.conn.execute('DELETE FROM search_cache WHERE query = ?', (key,))
+                return None
+            self.conn.execute('UPDATE search_cache SET accessed = ? WHERE query = ?', (now, key))
+        return json.loads(row[0])
+
+    def put(self, query, results):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?)',
+                              (normalize_query(query), json.dumps(results), now, now))
+            self.conn.execute('DELETE FROM search_cache WHERE query IN '
+                              '(SELECT query FROM search_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                              (self.max_entries,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+SCHOLAR_URL = "https://scholar.google.com/"
+RESULT_TAGS = re.compile(r'^(\s*\[[A-Z]+\])+\s*')  # "[PDF][PDF] ", "[CITATION] ", ... in front of titles
+RESULT_YEAR = re.compile(r'\b(?:1[89]|20)\d\d\b')
+
+def has_class(name):
+    """XPath predicate matching elements whose class list contains `name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def results_container(html):
+    """Cuts the results list (#gs_res_ccl_mid) out of a Scholar page, so only that part is parsed."""
+    start = html.find('id="gs_res_ccl_mid"')
+    if start == -1:
+        return None
+    start = html.rfind('<', 0, start)
+    end = html.find('id="gs_res_ccl_bot"', start)
+    end = html.rfind('<', start, end) if end != -1 else len(html)
+    return html[start:end]
+
+def cluster_id(result):
+    """Scholar's cluster ID, from the "All N versions" (or "Cited by") link of a result."""
+    for param in ('cluster', 'cites'):
+        for href in result.xpath(f".//a[contains(@href, '{param}=')]/@href"):
+            values = parse_qs(urlparse(href).query).get(param)
+            if values:
+                return values[0]
+    return None
+
+def parse_scholar_results(html, title_query):
+    """
+    Extracts result records from a Scholar results page:
+    [{'title', 'pdf_link', 'url', 'byline', 'year', 'cluster_id'}, ...] in
+    Scholar's order. `byline` is the authors/venue line; any field but the
+    title is None when Scholar doesn't show it.
+    """
+    container = results_container(html)
+    if not container:
+        return []
+    root = lxml_html.fromstring(container)
+    results = []
+    for result in root.xpath(f".//div[{has_class('gs_scl')}]"):
+        pdf_links = result.xpath(f".//div[{has_class('gs_ggsd')}]//a/@href")
+        heading = result.xpath(f".//h3[{has_class('gs_rt')}]")
+        landing = heading[0].xpath('.//a[@href]') if heading else []
+        if landing:
+            paper_title = landing[0].text_content()
+        elif heading:
+            paper_title = heading[0].text_content()
+        else:
+            paper_title = title_query
+        byline = result.xpath(f"string(.//div[{has_class('gs_a')}])").strip()
+        # "Authors - Venue, Year - host": look for the year in the middle part
+        parts = byline.split(' - ')
+        years = RESULT_YEAR.findall(parts[1] if len(parts) > 1 else byline)
+        results.append({
+            'title': RESULT_TAGS.sub('', ' '.join(paper_title.split())) or title_query,
+            'pdf_link': urljoin(SCHOLAR_URL, pdf_links[0]) if pdf_links else None,
+            'url': urljoin(SCHOLAR_URL, landing[0].get('href')) if landing else None,
+            'byline': byline or None,
+            'year': int(years[-1]) if years else None,
+            'cluster_id': cluster_id(result),
+        })
+    return results
+
+def parse_scholar_results_soup(html, title_query):
+    """The previous full-page BeautifulSoup parser, kept as the baseline for --benchmark-parser."""
+    soup = bs4.BeautifulSoup(html, 'lxml')
+    results = []
+    for result in soup.find_all('div', class_='gs_scl'):
+        pdf_link = None
+        pdf_section = result.find('div', class_='gs_ggsd')
+        if pdf_section and pdf_section.find('a'):
+            pdf_link = pdf_section.find('a')['href']
+        paper_title_tag = result.find('h3', class_='gs_rt')
+        paper_title = paper_title_tag.text if paper_title_tag else title_query
+        results.append({'title': paper_title, 'pdf_link': pdf_link})
+    return results
+
+def benchmark_parser(paths, rounds=20):
+    """Times both Scholar parsers on saved result pages and checks they find the same PDF links. Returns an exit code."""
+    mismatches = 0
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        timings, links = {}, {}
+        for name, parse in (('soup', parse_scholar_results_soup), ('lxml', parse_scholar_results)):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                results = parse(html, '')
+            timings[name] = (time.perf_counter() - started) / rounds
+            links[name] = [urljoin(SCHOLAR_URL, result['pdf_link']) if result['pdf_link'] else None
+                           for result in results]
+        same = links['soup'] == links['lxml']
+        mismatches += not same
+        print(json.dumps({'file': path, 'results': len(results),
+                          'soup_ms': round(timings['soup'] * 1000, 2), 'lxml_ms': round(timings['lxml'] * 1000, 2),
+                          'speedup': round(timings['soup'] / max(timings['lxml'], 1e-9), 1), 'same_pdf_links': same}))
+    return 1 if mismatches else 0
+
+def save_fixture(fixture_dir, title_query, html):
+    """Keeps a copy of a Scholar results page, named after its query, for parser benchmarks."""
+    try:
+        os.makedirs(fixture_dir, exist_ok=True)
+        name = re.sub(r'\s+', '_', normalize_query(title_query))[:80] or 'results'
+        with open(os.path.join(fixture_dir, f"{name}.html"), 'w', encoding='utf-8') as f:
+            f.write(html)
+    except OSError as e:
+        print(f"Could not save Scholar page: {e}", file=sys.stderr)
+
+def rank_results(title_query, results):
+    """
+    Orders results by how closely their titles match the query, in coarse
+    steps so Scholar's own ranking still decides between similar matches.
+    """
+    return sorted(results, key=lambda result: -round(title_similarity(title_query, result['title']), 1))
+
+def result_filename(result):
+    """File name stem for a result: its title, plus the year when Scholar shows one."""
+    year = result.get('year')
+    return f"{result['title']} ({year})" if year else result['title']
+
+BLOCK_PAGE_MARKERS = ('gs_captcha', 'g-recaptcha', 'id="recaptcha"', 'unusual traffic',
+                      "not a robot", '/sorry/index')
+
+def is_blocked_page(page_source):
+    """True if Scholar served a CAPTCHA or "unusual traffic" page instead of results."""
+    page = page_source.lower()
+    return any(marker in page for marker in BLOCK_PAGE_MARKERS)
+
+class ScholarBlocked(Exception):
+    """Scholar kept showing a CAPTCHA page until the wait timed out."""
+
+class ScholarRateLimiter:
+    """
+    Paces Scholar page loads with a token bucket plus random jitter.
+    The refill rate adapts: it is halved and paused with exponential backoff
+    whenever a CAPTCHA page shows up, and creeps back towards
+    `rate_per_minute` after each successful page, so sustained throughput stays
+    as high as Scholar tolerates.
+    """
+    def __init__(self, rate_per_minute=6, burst=2, jitter=3.0, block_backoff=120, max_backoff=1800):
+        self.max_rate = rate_per_minute / 60
+        self.rate = self.max_rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.jitter = jitter
+        self.base_backoff = block_backoff
+        self.backoff = block_backoff
+        self.max_backoff = max_backoff
+        self.blocked_until = 0
+        self.block_count = 0
+        self.updated = time.monotonic()
+        self.recent = deque()  # Times of page loads in the last minute
+        self.cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Blocks until the next page load may start. Returns False if shutdown was requested meanwhile."""
+        with self.cond:
+            while not shutdown_event.is_set():
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.recent.append(now)
+                    break
+                self.cond.wait(min(wait, 1))
+            else:
+                return False
+        # Jitter outside the lock so pacing doesn't look machine-regular
+        return not shutdown_event.wait(random.uniform(0, self.jitter))
+
+    def report_success(self):
+        with self.cond:
+            self.backoff = self.base_backoff
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+    def report_block(self):
+        with self.cond:
+            now = time.monotonic()
+            self.block_count += 1
+            self.blocked_until = max(self.blocked_until, now + self.backoff * random.uniform(1, 1.25))
+            self.backoff = min(self.max_backoff, self.backoff * 2)
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self.tokens = 0
+            self.cond.notify_all()
+
+    def set_rate(self, rate_per_minute):
+        """Changes the sustained rate cap, e.g. after the settings file was edited."""
+        with self.cond:
+            self.max_rate = rate_per_minute / 60
+            self.rate = min(self.rate, self.max_rate)
+            self.cond.notify_all()
+
+    def stats(self):
+        """Returns the page loads in the last minute, the current rate cap, block count and remaining pause."""
+        with self.cond:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            return {'requests_last_minute': len(self.recent), 'rate_per_minute': round(self.rate * 60, 1),
+                    'blocks': self.block_count, 'paused_for': round(max(0, self.blocked_until - now))}
+
+def search_scholar(browser, limiter, title_query, fixture_dir=None, start=0, base_url=SCHOLAR_URL, captcha_wait=300):
+    """
+    Loads a Scholar results page for a title once the rate limiter allows it
+    (`start` is the offset of its first result, for pages after the first),
+    and parses it. A CAPTCHA page triggers the limiter's backoff; the browser
+    stays open so it can be solved by hand, and ScholarBlocked is raised if it
+    isn't solved within `captcha_wait` seconds (at once if that is 0). Returns
+    None if shutdown interrupted the search.
+    With `fixture_dir`, the results page is also saved there; `base_url` is
+    the Scholar site to search.
+    """
+    update_queue.put(('update_status', title_query, 'Waiting for Scholar...'))
+    with metrics.span('rate_limit_wait', title=title_query):
+        if not limiter.acquire():
+            return None
+    with metrics.span('browser_acquire', title=title_query) as span:
+        span['launched'] = not browser.is_alive()
+        if span['launched']:
+            update_queue.put(('update_status', title_query, 'Opening browser...'))
+        driver = browser.acquire()
+
+    search_query = f'{title_query} + paper'
+    search_url = f"{urljoin(base_url, 'scholar')}?hl=en&q={quote_plus(search_query)}"
+    if start:
+        search_url += f"&start={start}"
+    results_present = EC.presence_of_element_located((selenium_by.By.ID, "gs_res_ccl_mid"))
+    def page_state(d):
+        if shutdown_event.is_set():
+            return 'shutdown'
+        # presence_of_element_located raises rather than returning False, and
+        # WebDriverWait swallows that, so catch it here or a CAPTCHA page is never checked
+        try:
+            if results_present(d):
+                return 'results'
+        except selenium_exceptions.NoSuchElementException:
+            pass
+        if is_blocked_page(d.page_source):
+            return 'blocked'
+        return False
+
+    with metrics.span('page_load', title=title_query, start=start) as span:
+        driver.get(search_url)
+        state = span['state'] = selenium_wait.WebDriverWait(driver, 300).until(page_state)
+    if state == 'blocked':
+        limiter.report_block()
+        update_queue.put(('scholar_stats', None, limiter.stats()))
+        if not captcha_wait:
+            raise ScholarBlocked(title_query)
+        update_queue.put(('update_status', title_query, 'Blocked: solve CAPTCHA in browser'))
+        # Stop waiting (e.g. on an unsolved CAPTCHA) as soon as shutdown is requested
+        try:
+            with metrics.span('captcha_wait', title=title_query):
+                selenium_wait.WebDriverWait(driver, captcha_wait).until(lambda d: shutdown_event.is_set() or results_present(d))
+        except selenium_exceptions.TimeoutException:
+            raise ScholarBlocked(title_query)
+    if shutdown_event.is_set():
+        return None
+
+    limiter.report_success()
+    update_queue.put(('scholar_stats', None, limiter.stats()))
+    update_queue.put(('update_status', title_query, 'Searching...'))
+    page_source = driver.page_source
+    if fixture_dir:
+        save_fixture(fixture_dir, f"{title_query} {start}" if start else title_query, page_source)
+    with metrics.span('parse', title=title_query) as span:
+        results = parse_scholar_results(page_source, title_query)
+        span['results'] = len(results)
+    return results
+
+def format_latency(seconds):
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+def report_source(title_query, source, started):
+    """Shows how a title was resolved and how long resolution took, e.g. 'arXiv · 0.8 s'."""
+    update_queue.put(('set_source', title_query, f"{source} · {format_latency(time.monotonic() - started)}"))
+
+SCHOLAR_PAGE_SIZE = 10
+
+def results_suffice(results, num_to_download):
+    """True if cached results hold enough PDFs, or Scholar had no further pages when they were searched."""
+    pdf_count = sum(1 for result in results if result['pdf_link'])
+    return pdf_count >= num_to_download or len(results) % SCHOLAR_PAGE_SIZE != 0
+
+def start_downloads(pool, title_query, num_to_download, download_path, results, search_done=True):
+    """
+    Hands a title's PDF results to the download stage and returns its TitleJob.
+    With `search_done=False` more pages are still to come through
+    TitleJob.add_results, and the caller must call finish_search().
+    """
+    update_queue.put(('update_status', title_query, f'Found {len(results)} results'))
+    job_store.update(title_query, 'downloading')
+    title_job = TitleJob(title_query, num_to_download, download_path)
+    title_job.add_results(pool, results)
+    if search_done:
+        title_job.finish_search()
+    return title_job
+
+def title_similarity(a, b):
+    return difflib.SequenceMatcher(None, normalize_query(a), normalize_query(b)).ratio()
+
+def resolve_arxiv_batch(client, titles, threshold):
+    """Looks up several titles with a single arXiv API request. Returns {title: arxiv.Result} for confident matches."""
+    phrases = [normalize_query(title) for title in titles]
+    query = ' OR '.join(f'ti:"{phrase}"' for phrase in phrases if phrase)
+    if not query:
+        return {}
+    candidates = list(client.results(arxiv.Search(query=query, max_results=5 * len(titles))))
+    matches = {}
+    for title in titles:
+        scored = [(title_similarity(title, result.title), result) for result in candidates]
+        best_score, best = max(scored, key=lambda pair: pair[0], default=(0, None))
+        if best is not None and best_score >= threshold:
+            matches[title] = best
+    return matches
+
+def resolver_worker(pool, search_cache, scheduler, settings):
+    """
+    The resolution stage, ahead of the browser. Titles are taken off
+    download_queue in batches; those in the search cache or matched on arXiv
+    (one API request per batch) go straight to the download stage, and the
+    rest are forwarded to the Scholar search stage.
+    """
+    arxiv_client = arxiv.Client(num_retries=2) if settings['arxiv_fast_path'] else None
+    batch_size = max(1, settings['arxiv_batch_size'])
+    stopping = False
+    while not stopping and not shutdown_event.is_set():
+        try:
+            item = download_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        batch = []
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                break
+            try:
+                item = download_queue.get_nowait()
+            except queue.Empty:
+                break
+        if item is None:
+            stopping = True
+
+        arxiv_batch = []
+        for title_query, num_to_download, download_path, bypass_cache in batch:
+            metrics.dequeued('queue', title_query)
+            job_store.update(title_query, 'searching', new_attempt=True)
+            started = time.monotonic()
+            with metrics.span('cache_lookup', title=title_query) as span:
+                results = None if bypass_cache else search_cache.get(title_query)
+                span['hit'] = bool(results)
+            if results and results_suffice(results, num_to_download):
+                report_source(title_query, 'Cache', started)
+                start_downloads(pool, title_query, num_to_download, download_path, results)
+            elif arxiv_client and num_to_download == 1:
+                arxiv_batch.append((title_query, num_to_download, download_path, bypass_cache))
+            else:
+                metrics.queued('search_queue', title_query)
+                scheduler.put(SearchTask(title_query, num_to_download, download_path, bypass_cache))
+
+        if arxiv_batch:
+            started = time.monotonic()
+            for title_query, *_ in arxiv_batch:
+                update_queue.put(('update_status', title_query, 'Checking arXiv...'))
+            try:
+                with metrics.span('arxiv_lookup', titles=len(arxiv_batch)) as span:
+                    matches = resolve_arxiv_batch(arxiv_client, [job[0] for job in arxiv_batch],
+                                                  settings['arxiv_match_threshold'])
+                    span['matches'] = len(matches)
             except Exception as e:
-                print(f"Error processing '{title_query}': {e}")
-                update_queue.put(('update_status', title_query, 'Error: Search Failed'))
-            
+                print(f"arXiv lookup failed: {e}", file=sys.stderr)
+                matches = {}
+            for title_query, num_to_download, download_path, bypass_cache in arxiv_batch:
+                match = matches.get(title_query)
+                if match and match.pdf_url:  # Without a PDF link, Scholar may still find one
+                    report_source(title_query, 'arXiv', started)
+                    start_downloads(pool, title_query, num_to_download, download_path,
+                                    [{'title': match.title, 'pdf_link': match.pdf_url, 'url': match.entry_id,
+                                      'year': match.published.year if match.published else None}])
+                else:
+                    metrics.queued('search_queue', title_query)
+                    scheduler.put(SearchTask(title_query, num_to_download, download_path, bypass_cache))
+
+        for _ in batch:
+            download_queue.task_done()
+    scheduler.close()
+
+class SearchTask:
+    """A title on its way through the search stage, possibly across several results pages."""
+    def __init__(self, title_query, num_to_download, download_path, bypass_cache):
+        self.title_query = title_query
+        self.num_to_download = num_to_download
+        self.download_path = download_path
+        self.bypass_cache = bypass_cache
+        self.results = []
+        self.title_job = None  # Set once the first page is in
+        self.blocks = 0
+
+class SearchScheduler:
+    """
+    The work queue shared by all search workers. New titles and follow-up
+    pages of titles already being searched wait in separate lanes that are
+    served alternately, so neither a long reading list nor one title with
+    many pages can starve the other.
+    """
+    def __init__(self):
+        self.lanes = (deque(), deque())  # New titles, follow-up pages
+        self.turn = 0
+        self.closed = False
+        self.parked = 0  # Tasks waiting to see whether they need more pages
+        self.cond = threading.Condition()
+
+    def put(self, task):
+        with self.cond:
+            self.lanes[1 if task.title_job else 0].append(task)
+            self.cond.notify()
+
+    def get(self, timeout=1):
+        """Returns the next task, None once closed and drained, or raises queue.Empty after `timeout`."""
+        with self.cond:
+            if not any(self.lanes) and (not self.closed or self.parked):
+                self.cond.wait(timeout)
+            for _ in self.lanes:
+                lane = self.lanes[self.turn]
+                self.turn = 1 - self.turn
+                if lane:
+                    return lane.popleft()
+            if self.closed and not self.parked:
+                return None
+            raise queue.Empty
+
+    def park(self):
+        """Holds a place for a task that may come back; workers don't exit while any are parked."""
+        with self.cond:
+            self.parked += 1
+
+    def unpark(self, task=None):
+        """Releases a park(), requeueing `task` if given."""
+        with self.cond:
+            self.parked -= 1
+            if task:
+                self.lanes[1 if task.title_job else 0].append(task)
+            self.cond.notify_all()
+
+    def close(self):
+        """No new titles will come; workers exit once the remaining tasks are done."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+def copy_profile_file(src, dst):
+    """
+    copytree's copy function for profile clones. SQLite databases (cookies,
+    logins, history) go through sqlite3's backup API, which gives a consistent
+    snapshot even while worker 0's Chrome is writing to them.
+    """
+    with open(src, 'rb') as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            return shutil.copy2(src, dst)
+    try:
+        source = sqlite3.connect(src, timeout=5, isolation_level=None)
+        try:
+            # Hold a read lock for the whole copy: backup() itself retries a locked database forever
+            source.execute('BEGIN')
+            source.execute('SELECT count(*) FROM sqlite_master').fetchone()
+            target = sqlite3.connect(dst)
+            try:
+                source.backup(target)
             finally:
-                if driver:
-                    driver.quit()
-                download_queue.task_done()
+                target.close()
+        finally:
+            source.close()
+    except sqlite3.Error as e:
+        if os.path.exists(dst):
+            os.remove(dst)  # A missing database is better than a half-copied one
+        raise OSError(f"{src}: {e}")  # copytree records OSErrors and carries on
+    return dst
+
+def profile_for_worker(index):
+    """
+    The Chrome user-data directory of search worker `index`. Worker 0 uses
+    PROFILE_PATH itself; the others get clones of it (minus caches, lock
+    files and SQLite journals), made on first use and kept across launches.
+    """
+    if index == 0:
+        return PROFILE_PATH
+    path = os.path.join(PROFILE_POOL_DIR, f"worker-{index}")
+    if not os.path.isdir(path):
+        os.makedirs(PROFILE_POOL_DIR, exist_ok=True)
+        if os.path.isdir(PROFILE_PATH):
+            try:
+                shutil.copytree(PROFILE_PATH, path, dirs_exist_ok=True, copy_function=copy_profile_file,
+                                ignore=shutil.ignore_patterns('Singleton*', 'lockfile', '*Cache*', 'Crashpad',
+                                                              'GrShaderCache', 'Service Worker',
+                                                              '*-journal', '*-wal', '*-shm'))
+            except (shutil.Error, OSError) as e:
+                print(f"Profile clone for search worker {index} is incomplete: {e}", file=sys.stderr)
+        os.makedirs(path, exist_ok=True)
+    return path
+
+def rotate_profile(index):
+    """
+    Replaces a CAPTCHA'd clone with a fresh copy of the base profile and
+    returns its path. The base profile itself is never discarded.
+    """
+    if index:
+        shutil.rmtree(os.path.join(PROFILE_POOL_DIR, f"worker-{index}"), ignore_errors=True)
+    return profile_for_worker(index)
+
+def search_next_page(task, browser, limiter, pool, search_cache, scheduler, settings, captcha_wait=300):
+    """
+    Loads the next results page of `task` and hands its PDFs to the download
+    stage. The task is rescheduled while it still needs more PDFs, and
+    finished otherwise. Returns False if the page was blocked by a CAPTCHA
+    that wasn't solved within `captcha_wait` seconds.
+    """
+    title_query = task.title_query
+    title_job = task.title_job
+    if title_job is None:
+        metrics.dequeued('search_queue', title_query)
+    elif not title_job.needs_more():
+        pause_search(task, search_cache, scheduler)
+        return True
+
+    started = time.monotonic()
+    try:
+        page = search_scholar(browser, limiter, title_query, settings['scholar_fixture_dir'],
+                              start=len(task.results), base_url=settings['scholar_url'], captcha_wait=captcha_wait)
+    except Exception as e:
+        blocked = isinstance(e, ScholarBlocked)
+        # Retry after the backoff; cached and arXiv titles keep flowing through the resolver meanwhile.
+        # A later page is retried too when another worker can take it (captcha_wait is 0 then)
+        if (blocked if title_job is None else not captcha_wait) and task.blocks < settings['scholar_block_retries']:
+            task.blocks += 1
+            if title_job is None:
+                update_queue.put(('update_status', title_query, 'Blocked: retrying later'))
+                metrics.queued('search_queue', title_query)
+            scheduler.put(task)
+        elif title_job:
+            # Keep what was found rather than retrying a title whose downloads have started
+            print(f"Stopped paging results for '{title_query}': {e!r}", file=sys.stderr)
+            search_cache.put(title_query, task.results)
+            title_job.finish_search()
+        elif blocked:
+            update_queue.put(('update_status', title_query, 'Error: Blocked'))
+            finish_title(title_query, 0, task.num_to_download, 'Blocked by Scholar')
+        else:
+            print(f"Error processing '{title_query}': {e}", file=sys.stderr)
+            update_queue.put(('update_status', title_query, 'Error: Search Failed'))
+            finish_title(title_query, 0, task.num_to_download, f'Search Failed: {e}')
+        return not blocked
+    if page is None:
+        return True  # Shutting down
+
+    task.results.extend(page)
+    if title_job is None:
+        report_source(title_query, 'Scholar', started)
+        if not page:
+            update_queue.put(('update_status', title_query, 'Error: Not Found'))
+            finish_title(title_query, 0, task.num_to_download, 'Not Found')
+            return True
+        task.title_job = start_downloads(pool, title_query, task.num_to_download, task.download_path, page,
+                                         search_done=False)
+    else:
+        update_queue.put(('update_status', title_query, f'Found {len(task.results)} results'))
+        title_job.add_results(pool, page)
+
+    # Read further pages while the found PDFs download, until there are enough
+    if len(page) < SCHOLAR_PAGE_SIZE or len(task.results) >= settings['scholar_max_pages'] * SCHOLAR_PAGE_SIZE:
+        search_cache.put(title_query, task.results)
+        task.title_job.finish_search()
+    elif task.title_job.needs_more():
+        scheduler.put(task)
+    else:
+        pause_search(task, search_cache, scheduler)
+    return True
+
+def pause_search(task, search_cache, scheduler):
+    """Parks a task that has enough candidates for now; it pages on if their downloads fail."""
+    def resume(short):
+        if short:
+            scheduler.unpark(task)
+        else:
+            scheduler.unpark()
+            search_cache.put(task.title_query, task.results)
+            task.title_job.finish_search()
+    scheduler.park()
+    task.title_job.pause_search(resume)
+
+def abandon_search(task, error):
+    """Ends a task whose search raised unexpectedly: its title fails, or keeps the downloads it already started."""
+    if task.title_job:
+        task.title_job.finish_search()
+    else:
+        update_queue.put(('update_status', task.title_query, 'Error: Search Failed'))
+        finish_title(task.title_query, 0, task.num_to_download, f'Search Failed: {error}')
+
+class SearchPool:
+    """
+    The search stage: up to N worker threads, each driving its own Chrome
+    with its own profile (see profile_for_worker), taking tasks from a shared
+    SearchScheduler and pacing page loads through one shared rate limiter.
+    A worker whose page gets CAPTCHA'd while other workers are running doesn't
+    wait for it to be solved: it quits its browser, gets a fresh profile clone
+    and sits out `search_profile_quarantine` seconds.
+    resize() grows or shrinks the pool while it runs.
+    """
+    def __init__(self, scheduler, limiter, pool, search_cache, settings):
+        self.scheduler = scheduler
+        self.limiter = limiter
+        self.pool = pool
+        self.search_cache = search_cache
+        self.settings = settings
+        self.workers = {}  # Index -> (thread, retire event)
+        self.quarantined = set()
+        self.size = 0
+        self.drained = threading.Event()  # Set once the scheduler is closed and empty
+        self.lock = threading.Lock()
+
+    def resize(self, size):
+        size = self.size = max(1, size)
+        with self.lock:
+            for index, (thread, retire) in list(self.workers.items()):
+                if not thread.is_alive():
+                    del self.workers[index]
+                elif index >= size:
+                    retire.set()  # Exits after its current page
+            for index in range(size):
+                if index not in self.workers:
+                    retire = threading.Event()
+                    thread = threading.Thread(target=self._run, args=(index, retire), daemon=True)
+                    self.workers[index] = (thread, retire)
+                    thread.start()
+        self.report()
+
+    def revive(self):
+        """Restarts workers that died unexpectedly, unless the scheduler has run dry."""
+        with self.lock:
+            dead = [index for index, (thread, retire) in self.workers.items()
+                    if not thread.is_alive() and not retire.is_set()]
+        if dead and not self.drained.is_set():
+            print(f"Restarting search workers {dead}", file=sys.stderr)
+            self.resize(self.size)
+
+    def active(self):
+        with self.lock:
+            return sum(1 for thread, retire in self.workers.values() if thread.is_alive() and not retire.is_set())
+
+    def alive(self):
+        with self.lock:
+            return any(thread.is_alive() for thread, _ in self.workers.values())
+
+    def _others_available(self, index):
+        """True if another running, unquarantined worker can take over from worker `index`."""
+        with self.lock:
+            return any(thread.is_alive() and not retire.is_set() and other != index and other not in self.quarantined
+                       for other, (thread, retire) in self.workers.items())
+
+    def report(self):
+        with self.lock:
+            quarantined = len(self.quarantined)
+        update_queue.put(('search_pool', None, {'workers': self.active(), 'quarantined': quarantined}))
+
+    def _quarantine(self, index, browser, retire):
+        browser.quit()
+        browser.profile_path = rotate_profile(index)
+        with self.lock:
+            self.quarantined.add(index)
+        self.report()
+        retire.wait(self.settings['search_profile_quarantine'])
+        with self.lock:
+            self.quarantined.discard(index)
+        self.report()
+
+    def _run(self, index, retire):
+        settings = self.settings
+        browser = None
+        prewarmed = False
+        try:
+            browser = BrowserSession(profile_for_worker(index), max_pages=settings['browser_max_pages'],
+                                     headless=settings['browser_headless'])
+            while not shutdown_event.is_set() and not retire.is_set():
+                try:
+                    task = self.scheduler.get(timeout=1)
+                except queue.Empty:
+                    # Use the idle time to pre-warm the first browser once
+                    if index == 0 and browser_prewarm.is_set() and not prewarmed:
+                        prewarmed = True
+                        try:
+                            browser.warm_up()
+                        except Exception as e:
+                            print(f"Could not pre-warm the browser: {e}", file=sys.stderr)
+                    continue
+                if task is None:
+                    self.drained.set()
+                    break
+                # Nobody can solve a CAPTCHA in a headless browser, and waiting for one is pointless
+                # while other browsers can take the title
+                can_hand_off = self._others_available(index)
+                captcha_wait = 0 if settings['browser_headless'] or can_hand_off else 300
+                try:
+                    if not search_next_page(task, browser, self.limiter, self.pool, self.search_cache,
+                                            self.scheduler, settings, captcha_wait) and can_hand_off:
+                        self._quarantine(index, browser, retire)
+                except Exception as e:
+                    # One title's failure must not take the worker down with it
+                    print(f"Search worker {index} failed on '{task.title_query}': {e!r}", file=sys.stderr)
+                    abandon_search(task, e)
+        except Exception as e:
+            print(f"Search worker {index} stopped: {e}", file=sys.stderr)
+        finally:
+            if browser:
+                browser.quit()
+            self.report()
+
+    def shutdown(self, timeout=2):
+        with self.lock:
+            workers = list(self.workers.values())
+        for _, retire in workers:
+            retire.set()
+        deadline = time.monotonic() + timeout
+        for thread, _ in workers:
+            thread.join(max(0, deadline - time.monotonic()))
+
+def settings_modified():
+    try:
+        return os.path.getmtime(SETTINGS_FILE)
+    except OSError:
+        return None
+
+def downloader_worker():
+    """
+    This function runs in a separate thread.
+    It wires up the pipeline: the resolver, the search pool (titles the
+    resolver couldn't satisfy from the search cache or arXiv are searched with
+    Selenium and persistent profiles, to reduce CAPTCHAs) and the parallel
+    download stage, then watches the settings file so the number of search
+    workers and the Scholar rate cap can change without a restart.
+    """
+    settings = load_settings()
+    search_cache = SearchCache(ttl=settings['search_cache_ttl_days'] * 86400,
+                               max_entries=settings['search_cache_max_entries'])
+    http = HttpClient(retries=settings['http_retries'], backoff=settings['http_backoff'],
+                      timeout=settings['http_timeout'], host_timeouts=settings['http_host_timeouts'],
+                      pool_size=settings['download_workers'])
+    pipeline_stats.watch('http', http.stats)
+    library = LibraryIndex()
+    pool = DownloadPool(http, library, workers=settings['download_workers'],
+                        per_host=settings['downloads_per_host'],
+                        backlog=settings['download_backlog'])
+    limiter = ScholarRateLimiter(rate_per_minute=settings['scholar_rate_per_minute'],
+                                 burst=settings['scholar_burst'], jitter=settings['scholar_jitter'],
+                                 block_backoff=settings['scholar_block_backoff'])
+    metrics_outputs = open_metrics_outputs(settings)
+    scheduler = SearchScheduler()
+    search_pool = SearchPool(scheduler, limiter, pool, search_cache, settings)
+    resolver = threading.Thread(target=resolver_worker, args=(pool, search_cache, scheduler, settings), daemon=True)
+    resolver.start()
+    try:
+        search_pool.resize(settings['search_workers'])
+        settings_mtime = settings_modified()
+        while not shutdown_event.wait(1) and not (search_pool.drained.is_set() and not search_pool.alive()):
+            search_pool.revive()
+            mtime = settings_modified()
+            if mtime != settings_mtime:
+                settings_mtime = mtime
+                try:
+                    fresh = load_settings()
+                    search_pool.resize(int(fresh['search_workers']))
+                    limiter.set_rate(float(fresh['scholar_rate_per_minute']))
+                except (TypeError, ValueError) as e:
+                    print(f"Ignoring invalid settings: {e}", file=sys.stderr)
+    finally:
+        search_pool.shutdown()
+        resolver.join(timeout=2)
+        pool.shutdown()
+        search_cache.close()
+        library.close()
+        close_metrics_outputs(metrics_outputs)
+
+startup_marks = {}  # Startup stage -> seconds since the process started
+
+def mark_startup(stage):
+    startup_marks[stage] = time.perf_counter() - STARTUP_STARTED
+
+def write_startup_report(print_report=False):
+    """Appends this launch's stage and per-import timings to STARTUP_LOG_PATH so cold start can be tracked across releases."""
+    report = {'time': round(time.time()), 'frozen': bool(getattr(sys, 'frozen', False)),
+              'python': platform.python_version(), 'platform': platform.system(),
+              'stages': {stage: round(seconds, 4) for stage, seconds in startup_marks.items()},
+              'imports': {name: round(seconds, 4) for name, seconds in IMPORT_TIMINGS.items()}}
+    try:
+        with open(STARTUP_LOG_PATH, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+    except OSError:
+        pass
+    if print_report:
+        print(json.dumps(report, indent=2), file=sys.stderr)
+
+def preload_heavy_modules(print_report=False):
+    """Imports the lazily loaded dependencies in the background, then records the startup report."""
+    for module in HEAVY_MODULES:
+        try:
+            module.load()
+        except ImportError as e:
+            print(f"Could not preload {module._name}: {e}", file=sys.stderr)
+    mark_startup('modules_loaded')
+    write_startup_report(print_report)
+
+def read_titles(source):
+    """Yields non-empty titles one line at a time from a file path, or from stdin for '-'."""
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line in stream:
+            title = line.strip()
+            if title:
+                yield title
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def run_batch(source, num_to_download, download_path, bypass_cache=False, max_pending=64):
+    """
+    Headless mode: runs titles from a file or stdin through the same pipeline as
+    the GUI and prints every update_queue event as a JSON line, followed by a
+    summary. At most `max_pending` titles are in the pipeline at once, so memory
+    stays bounded for reading lists of any length. Returns the exit code:
+    0 if every title got at least one PDF, 1 if any failed, 130 if interrupted.
+    """
+    downloader_thread = threading.Thread(target=downloader_worker, daemon=True)
+    downloader_thread.start()
+
+    pending = set()
+    pending_lock = threading.Lock()
+    pending_slots = threading.Semaphore(max(1, max_pending))
+    feeding_done = threading.Event()
+    summary = {'event': 'summary', 'titles': 0, 'complete': 0, 'partial': 0, 'failed': 0, 'files': 0}
+
+    def emit(event):
+        print(json.dumps(event), flush=True)
+
+    def feed_titles():
+        try:
+            for title in read_titles(source):
+                while not pending_slots.acquire(timeout=1):
+                    if shutdown_event.is_set():
+                        return
+                with pending_lock:
+                    duplicate = title in pending
+                    if not duplicate:
+                        pending.add(title)
+                        summary['titles'] += 1
+                if duplicate:
+                    pending_slots.release()
+                    emit({'event': 'skipped', 'id': title, 'data': 'Already queued'})
+                    continue
+                queue_title(title, num_to_download, download_path, bypass_cache)
+                browser_prewarm.set()
+        except OSError as e:
+            print(f"Error reading titles: {e}", file=sys.stderr)
+        finally:
+            feeding_done.set()
+
+    threading.Thread(target=feed_titles, daemon=True).start()
+    started = time.monotonic()
+    while not shutdown_event.is_set():
+        try:
+            msg_type, item_id, data = update_queue.get(timeout=0.5)
         except queue.Empty:
-            # This is expected when the queue is empty, just continue the loop
+            with pending_lock:
+                if feeding_done.is_set() and not pending:
+                    break
             continue
+        emit({'event': msg_type, 'id': item_id, 'data': data})
+        if msg_type == 'title_done':
+            with pending_lock:
+                pending.discard(item_id)
+            pending_slots.release()
+            summary['files'] += data['downloaded']
+            if data['downloaded'] == 0:
+                summary['failed'] += 1
+            elif data['downloaded'] < data['requested']:
+                summary['partial'] += 1
+            else:
+                summary['complete'] += 1
+
+    interrupted = shutdown_event.is_set()
+    shutdown_event.set()
+    download_queue.put(None)
+    downloader_thread.join(timeout=10)
+    summary['elapsed'] = round(time.monotonic() - started, 1)
+    summary['interrupted'] = interrupted
+    emit(summary)
+    if interrupted:
+        return 130
+    return 1 if summary['failed'] else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Download papers by title from Google Scholar and arXiv.")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="run headless on titles from FILE (one per line, '-' for stdin) instead of opening the GUI")
+    parser.add_argument('--max-downloads', type=int, default=1, metavar='N',
+                        help="PDFs to download per title (default: 1)")
+    parser.add_argument('--output', metavar='DIR', help="download folder (default: the GUI's last selected folder)")
+    parser.add_argument('--bypass-cache', action='store_true', help="ignore cached search results")
+    parser.add_argument('--max-pending', type=int, default=64, metavar='N',
+                        help="titles in the pipeline at once in batch mode (default: 64)")
+    parser.add_argument('--benchmark-parser', nargs='+', metavar='HTML',
+                        help="time the Scholar result parser on saved results pages and exit")
+    parser.add_argument('--startup-timing', action='store_true',
+                        help="print cold-start stage and import timings once they are collected")
+    # parse_known_args: macOS app bundles may be launched with extra arguments like -psn_…
+    return parser.parse_known_args(argv)[0]
 
 def get_application_path():
     if getattr(sys, 'frozen', False):
@@ -151,7 +2166,8 @@ def get_application_path():
         application_path = os.path.dirname(os.path.abspath(__file__))
     return application_path
 
-def load_settings():
+def read_settings_file():
+    """Returns only what is saved in SETTINGS_FILE, without DEFAULT_SETTINGS filled in."""
     try:
         with open(SETTINGS_FILE, 'r') as f:
             return json.load(f)
@@ -159,11 +2175,135 @@ def load_settings():
         default_path = get_application_path()
         return {'paths': [default_path], 'last_selected': default_path}
 
+def load_settings():
+    # Defaults are applied to this copy only, so they are never written back by save_settings
+    return {**DEFAULT_SETTINGS, **read_settings_file()}
+
 def save_settings(settings):
+    """Writes the user's settings, leaving out unset defaults so a later release can still change them."""
+    saved = read_settings_file()
+    stored = {key: value for key, value in settings.items()
+              if key in saved or key not in DEFAULT_SETTINGS or value != DEFAULT_SETTINGS[key]}
     with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=4)
+        json.dump(stored, f, indent=4)
+
+def update_settings(**changes):
+    """Saves `changes` on top of the settings file as it is now, so edits made to it while the app runs are kept."""
+    save_settings({**load_settings(), **changes})
+
+def row_state(status):
+    """Classifies a status string as 'failed', 'done' or 'active' for the queue view's filters."""
+    if status.startswith('Error') or status.startswith('Complete (0/'):
+        return 'failed'
+    if status.startswith('Complete') or status in ('Already downloaded', 'Linked from library'):
+        return 'done'
+    return 'active'
+
+QUEUE_FILTERS = {
+    'Show all': None,
+    'Hide completed': lambda row: row_state(row.status) != 'done',
+    'Failed only': lambda row: row_state(row.status) == 'failed',
+}
+
+class QueueRow:
+    """One line of the download queue. Slotted, since a big session holds tens of thousands."""
+    __slots__ = ('query', 'filename', 'source', 'status', 'children', 'separated')
+
+    def __init__(self, query='', filename='', source='', status=''):
+        self.query = query
+        self.filename = filename
+        self.source = source
+        self.status = status
+        self.children = None  # Set to a list once the title's first file shares its row
+        self.separated = False
+
+SEPARATOR_ROW = QueueRow()
+
+class QueueModel:
+    """
+    Compact model behind the download queue view. Every title and file row
+    lives here, and the Treeview only ever shows the window returned by
+    visible(), which honours the current filter and collapse mode.
+    """
+    def __init__(self):
+        self.titles = []
+        self.rows = {}  # Task id (a title, or a (title, n) sub-task) -> QueueRow
+        self.filter = None
+        self.collapsed = False
+        self._visible = None
+        self.changed = True  # Something on screen may need redrawing
+
+    def __contains__(self, task_id):
+        return task_id in self.rows
+
+    def _invalidate(self):
+        self._visible = None
+        self.changed = True
+
+    def add_title(self, title_query, status):
+        row = QueueRow(title_query, status=status)
+        self.titles.append(row)
+        self.rows[title_query] = row
+        self._invalidate()
+
+    def add_sub_task(self, sub_task_id, filename, status):
+        title_row = self.rows.get(sub_task_id[0])
+        if title_row is None or sub_task_id in self.rows:
+            return
+        if title_row.children is None:
+            # The first file is shown on the title's own row
+            title_row.children = []
+            title_row.filename, title_row.status = filename, status
+            self.rows[sub_task_id] = title_row
+        else:
+            row = QueueRow(filename=filename, status=status)
+            title_row.children.append(row)
+            self.rows[sub_task_id] = row
+        self._invalidate()
+
+    def set(self, task_id, column, value):
+        row = self.rows.get(task_id)
+        if row is None:
+            return
+        setattr(row, column, value)
+        if self.filter and column == 'status':
+            self._invalidate()  # The row may have moved in or out of the filter
+        else:
+            self.changed = True
+
+    def add_separator(self, title_query):
+        row = self.rows.get(title_query)
+        if row is not None and not row.separated:
+            row.separated = True
+            self._invalidate()
+
+    def set_view(self, filter_name, collapsed):
+        self.filter = QUEUE_FILTERS[filter_name]
+        self.collapsed = collapsed
+        self._invalidate()
+
+    def visible(self):
+        if self._visible is None:
+            visible = []
+            for title_row in self.titles:
+                if self.filter and not self.filter(title_row):
+                    continue
+                visible.append(title_row)
+                if title_row.children and not self.collapsed:
+                    visible.extend(title_row.children)
+                if title_row.separated:
+                    visible.append(SEPARATOR_ROW)
+            self._visible = visible
+        return self._visible
+
+def create_gui(downloader_thread, report_startup=False):
+    """Builds and runs the window. `downloader_thread` is started once the window is up."""
+    # Imported here so the headless --batch mode never loads Tkinter
+    started = time.perf_counter()
+    import tkinter as tk
+    from tkinter import scrolledtext, messagebox, ttk, filedialog
+    IMPORT_TIMINGS['tkinter'] = time.perf_counter() - started
 
-def create_gui(downloader_thread):
     root = tk.Tk()
     root.title("Paper Downloader")
     root.geometry("1600x800")
@@ -253,7 +2393,7 @@ def create_gui(downloader_thread):
             new_path = filedialog.askdirectory(title="Select a Folder")
             if new_path and new_path not in settings['paths']:
                 settings['paths'].append(new_path); listbox.insert(tk.END, new_path)
-                path_combobox['values'] = [shorten_path(p) for p in settings['paths']]; save_settings(settings)
+                path_combobox['values'] = [shorten_path(p) for p in settings['paths']]; update_settings(paths=settings['paths'])
         def remove_path():
             selected_indices = listbox.curselection()
             if not selected_indices: return
@@ -264,7 +2404,7 @@ def create_gui(downloader_thread):
                 path_combobox['values'] = [shorten_path(p) for p in settings['paths']]
                 if current_full_path == selected_path: path_combobox.current(0)
                 else: path_combobox.current(settings['paths'].index(current_full_path))
-                save_settings(settings)
+                update_settings(paths=settings['paths'])
             else:
                 messagebox.showwarning("Cannot Remove", "You must have at least one download path.")
         ttk.Button(btn_frame, text="Add", command=add_path).pack(side=tk.LEFT)
@@ -281,6 +2421,8 @@ def create_gui(downloader_thread):
     ttk.Label(max_downloads_frame, text="Max Downloads:", style='Content.TLabel').pack(side=tk.LEFT, padx=(0, 10))
     num_downloads_var = tk.IntVar(value=1)
     ttk.Spinbox(max_downloads_frame, from_=1, to=100, textvariable=num_downloads_var, width=5).pack(side=tk.LEFT)
+    bypass_cache_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(max_downloads_frame, text="Bypass cache", variable=bypass_cache_var).pack(side=tk.LEFT, padx=(10, 10))
     
     def add_papers_to_queue(event=None):
         titles = input_text.get("1.0", tk.END).strip().split('\n')
@@ -290,9 +2432,11 @@ def create_gui(downloader_thread):
             return
         for title in titles:
             clean_title = title.strip()
-            if clean_title and not queue_tree.exists(clean_title):
-                queue_tree.insert('', 'end', iid=clean_title, values=(clean_title, '', 'Queued'), open=True)
-                download_queue.put((clean_title, num_to_download, download_path))
+            if clean_title and clean_title not in queue_model:
+                queue_model.add_title(clean_title, 'Queued')
+                browser_prewarm.set()
+                job_store.add(clean_title, num_to_download, download_path, bypass_cache_var.get())
+                queue_title(clean_title, num_to_download, download_path, bypass_cache_var.get())
         input_text.delete("1.0", tk.END)
         return "break"
 
@@ -313,52 +2457,159 @@ def create_gui(downloader_thread):
 
     header_frame = ttk.Frame(right_frame); header_frame.grid(row=0, column=0, sticky='ew', pady=(20, 10))
     ttk.Label(header_frame, text="Download Queue", style='Bold.TLabel').pack(side=tk.LEFT)
+    queue_filter_var = tk.StringVar(value='Show all')
+    queue_filter = ttk.Combobox(header_frame, textvariable=queue_filter_var, values=list(QUEUE_FILTERS), state='readonly', width=14)
+    queue_filter.pack(side=tk.RIGHT)
+    collapse_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(header_frame, text="Collapse files", variable=collapse_var).pack(side=tk.RIGHT, padx=(10, 10))
+    show_stats_var = tk.BooleanVar(value=False)
+    stats_var = tk.StringVar()
+    stats_label = ttk.Label(right_frame, textvariable=stats_var, font=('Courier', 11), foreground='#444444', justify=tk.LEFT)
+
+    def toggle_stats():
+        if show_stats_var.get():
+            stats_var.set(format_pipeline_stats(pipeline_stats.snapshot()))
+            stats_label.grid(row=2, column=0, sticky='ew', pady=(8, 0))
+        else:
+            stats_label.grid_remove()
+
+    def refresh_stats():
+        if show_stats_var.get():
+            stats_var.set(format_pipeline_stats(pipeline_stats.snapshot()))
+        root.after(1000, refresh_stats)
+
+    ttk.Checkbutton(header_frame, text="Stats", variable=show_stats_var, command=toggle_stats).pack(side=tk.RIGHT)
+    scholar_stats_var = tk.StringVar()
+    scholar_status = {'scholar_stats': None, 'search_pool': None}  # Latest of each, combined in one label
+    ttk.Label(header_frame, textvariable=scholar_stats_var, foreground='#666666').pack(side=tk.RIGHT)
 
     tree_frame = ttk.Frame(right_frame, style='Content.TFrame', relief='solid', borderwidth=1)
     tree_frame.grid(row=1, column=0, sticky='nsew')
     
-    columns = ('query', 'filename', 'status')
-    queue_tree = ttk.Treeview(tree_frame, columns=columns, show='headings', style='Treeview')
-    queue_tree.heading('query', text='Your Query'); queue_tree.heading('filename', text='Downloaded File'); queue_tree.heading('status', text='Status')
-    queue_tree.column('query', width=250, anchor='w'); queue_tree.column('filename', width=400, anchor='w'); queue_tree.column('status', width=120, anchor='center')
+    # The Treeview only holds the rows on screen; scrolling re-fills them from queue_model
+    ROW_HEIGHT = 28
+    queue_model = QueueModel()
+    view = {'offset': 0, 'items': []}
+    columns = ('query', 'filename', 'source', 'status')
+    queue_tree = ttk.Treeview(tree_frame, columns=columns, show='headings', style='Treeview', selectmode='none')
+    queue_tree.heading('query', text='Your Query'); queue_tree.heading('filename', text='Downloaded File'); queue_tree.heading('source', text='Resolved Via'); queue_tree.heading('status', text='Status')
+    queue_tree.column('query', width=250, anchor='w'); queue_tree.column('filename', width=400, anchor='w'); queue_tree.column('source', width=120, anchor='center'); queue_tree.column('status', width=120, anchor='center')
+    queue_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+    queue_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     queue_tree.pack(fill=tk.BOTH, expand=True)
     queue_tree.tag_configure('separator', background=BORDER_COLOR)
 
+    def render_queue_view():
+        """Materializes the visible window of queue_model into the Treeview's fixed set of items."""
+        rows = queue_model.visible()
+        capacity = max(1, queue_tree.winfo_height() // ROW_HEIGHT - 1)  # Minus the heading row
+        view['offset'] = offset = max(0, min(view['offset'], len(rows) - capacity))
+        items = view['items']
+        while len(items) < capacity:
+            items.append(queue_tree.insert('', 'end'))
+        while len(items) > capacity:
+            queue_tree.delete(items.pop())
+        for i, item in enumerate(items):
+            row = rows[offset + i] if offset + i < len(rows) else None
+            if row is None or row is SEPARATOR_ROW:
+                queue_tree.item(item, values=('', '', '', ''), tags=('separator',) if row else ())
+            else:
+                queue_tree.item(item, values=(row.query, row.filename, row.source, row.status), tags=())
+        queue_tree.yview_moveto(0)
+        if len(rows) > capacity:
+            queue_scrollbar.set(offset / len(rows), (offset + capacity) / len(rows))
+        else:
+            queue_scrollbar.set(0, 1)
+        queue_model.changed = False
+
+    def scroll_queue_view(action, amount, unit=None):
+        capacity = len(view['items']) or 1
+        if action == 'moveto':
+            view['offset'] = int(float(amount) * len(queue_model.visible()))
+        else:
+            view['offset'] += int(amount) * (capacity if unit == 'pages' else 1)
+        render_queue_view()
+
+    def on_queue_mousewheel(event):
+        if event.num in (4, 5):
+            steps = 3 if event.num == 5 else -3
+        elif abs(event.delta) >= 120:
+            steps = -event.delta // 40  # Windows: 120 per notch
+        else:
+            steps = -event.delta  # macOS: small deltas
+        scroll_queue_view('scroll', steps)
+        return "break"
+
+    def on_queue_view_changed(*args):
+        queue_model.set_view(queue_filter_var.get(), collapse_var.get())
+        view['offset'] = 0
+        render_queue_view()
+
+    queue_scrollbar.configure(command=scroll_queue_view)
+    for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+        queue_tree.bind(sequence, on_queue_mousewheel)
+    queue_tree.bind('<Configure>', lambda event: render_queue_view())
+    queue_filter.bind('<<ComboboxSelected>>', on_queue_view_changed)
+    collapse_var.trace_add('write', on_queue_view_changed)
+
+    MAX_MESSAGES_PER_TICK = 2000
+
+    # Resume titles a previous session left unfinished
+    for title_query, num_to_download, download_path, bypass_cache in job_store.unfinished():
+        if title_query not in queue_model:
+            queue_model.add_title(title_query, 'Queued (resumed)')
+            browser_prewarm.set()
+            queue_title(title_query, num_to_download, download_path, bypass_cache)
+
     def process_gui_updates():
+        """
+        Drains a bounded number of messages per tick into queue_model, where
+        repeated updates to a row simply overwrite each other, then redraws the
+        visible window once, so bursts of progress messages can't stall the UI.
+        """
+        more_work = False
         try:
-            while not update_queue.empty():
-                message = update_queue.get_nowait()
-                msg_type, item_id, data = message
+            stats_changed = False
+            for _ in range(MAX_MESSAGES_PER_TICK):
+                try:
+                    msg_type, item_id, data = update_queue.get_nowait()
+                except queue.Empty:
+                    break
                 if msg_type == 'update_status':
-                    status = data
-                    if '_' not in item_id:
-                        if queue_tree.exists(item_id): queue_tree.set(item_id, 'status', status)
-                    else:
-                        original_query = item_id.split('_')[0]
-                        if item_id.endswith('_1') and queue_tree.exists(original_query):
-                            queue_tree.set(original_query, 'status', status)
-                        elif queue_tree.exists(item_id):
-                            queue_tree.set(item_id, 'status', status)
+                    queue_model.set(item_id, 'status', data)
+                elif msg_type == 'set_source':
+                    queue_model.set(item_id, 'source', data)
                 elif msg_type == 'add_sub_task':
                     filename, status = data
-                    original_query = item_id.split('_')[0]
-                    if not queue_tree.exists(original_query): continue
-                    if item_id.endswith('_1'):
-                        queue_tree.set(original_query, 'filename', filename); queue_tree.set(original_query, 'status', status)
-                    else:
-                        if not queue_tree.exists(item_id):
-                            queue_tree.insert(original_query, 'end', iid=item_id, values=('', filename, status))
+                    queue_model.add_sub_task(item_id, filename, status)
+                elif msg_type in ('scholar_stats', 'search_pool'):
+                    scholar_status[msg_type] = data  # Only the latest matters
+                    stats_changed = True
                 elif msg_type == 'add_separator':
-                    separator_id = f"sep_{item_id}"
-                    if not queue_tree.exists(separator_id):
-                        queue_tree.insert('', 'end', iid=separator_id, tags=('separator',))
+                    queue_model.add_separator(item_id)
+            else:
+                more_work = True
+
+            scholar_stats = scholar_status['scholar_stats']
+            if stats_changed and scholar_stats:
+                paused = f" · paused {scholar_stats['paused_for']} s" if scholar_stats['paused_for'] else ''
+                search_pool = scholar_status['search_pool']
+                browsers = ''
+                if search_pool and (search_pool['workers'] > 1 or search_pool['quarantined']):
+                    browsers = f" · {search_pool['workers']} browsers"
+                    if search_pool['quarantined']:
+                        browsers += f" ({search_pool['quarantined']} quarantined)"
+                scholar_stats_var.set(f"Scholar: {scholar_stats['requests_last_minute']} req/min "
+                                      f"(cap {scholar_stats['rate_per_minute']}) · {scholar_stats['blocks']} blocks{paused}{browsers}")
+            if queue_model.changed:
+                render_queue_view()
         except tk.TclError:
             # Window has been destroyed, stop processing updates
             return
         finally:
-            # Only schedule next update if window still exists
+            # Only schedule next update if window still exists; come back sooner while backlogged
             try:
-                root.after(100, process_gui_updates)
+                root.after(16 if more_work else 100, process_gui_updates)
             except tk.TclError:
                 # Window destroyed, stop scheduling updates
                 pass
@@ -370,17 +2621,29 @@ def create_gui(downloader_thread):
             current_path = get_current_full_path()
             if current_path:
                 settings['last_selected'] = current_path
-            save_settings(settings)
+            update_settings(paths=settings['paths'], last_selected=settings.get('last_selected', settings['paths'][0]))
         except:
             pass  # Don't let settings save failure prevent shutdown
         
         try:
-            # Signal the downloader thread to stop (but don't wait)
+            # Signal the downloader thread to stop
             shutdown_event.set()
             download_queue.put(None)
         except:
             pass
         
+        try:
+            # Give the worker a moment to close its browser session
+            downloader_thread.join(timeout=3)
+        except:
+            pass
+        
+        try:
+            # Persist job states before a possible forced kill
+            job_store.close()
+        except:
+            pass
+        
         try:
             # Destroy the window
             root.destroy()
@@ -433,18 +2696,45 @@ def create_gui(downloader_thread):
                 os._exit(0)
 
 
+    def on_window_shown():
+        # Heavy work starts only after the first paint, so the window appears immediately
+        root.update_idletasks()
+        mark_startup('window_shown')
+        downloader_thread.start()
+        threading.Thread(target=preload_heavy_modules, args=(report_startup,), daemon=True).start()
+
+    refresh_stats()
+    mark_startup('window_built')
     root.protocol("WM_DELETE_WINDOW", on_closing)
     process_gui_updates()
+    root.after_idle(on_window_shown)
     
     try:
         root.mainloop()
     except KeyboardInterrupt:
         on_closing()
     except Exception as e:
-        print(f"GUI error: {e}")
+        print(f"GUI error: {e}", file=sys.stderr)
         on_closing()
 
 if __name__ == "__main__":
+    mark_startup('imports')
+    args = parse_args()
+    if args.benchmark_parser:
+        sys.exit(benchmark_parser(args.benchmark_parser))
+    if args.batch:
+        settings = load_settings()
+        download_path = args.output or settings.get('last_selected', settings['paths'][0])
+        if not os.path.isdir(download_path):
+            print(f"Download folder does not exist: {download_path}", file=sys.stderr)
+            sys.exit(2)
+        # Ctrl+C stops the pipeline; run_batch still prints its summary
+        signal.signal(signal.SIGINT, lambda signum, frame: shutdown_event.set())
+        if hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, lambda signum, frame: shutdown_event.set())
+        sys.exit(run_batch(args.batch, max(1, args.max_downloads), download_path,
+                           bypass_cache=args.bypass_cache, max_pending=args.max_pending))
+
     # Global cleanup function
     def cleanup_on_exit():
         """Cleanup function to ensure proper shutdown."""
@@ -468,12 +2758,12 @@ if __name__ == "__main__":
         signal.signal(signal.SIGTERM, signal_handler)
     
     try:
+        job_store.open()
         downloader_thread = threading.Thread(target=downloader_worker)
         downloader_thread.daemon = True
-        downloader_thread.start()
-        create_gui(downloader_thread)
+        create_gui(downloader_thread, report_startup=args.startup_timing)
     except KeyboardInterrupt:
         cleanup_on_exit()
     except Exception as e:
-        print(f"Error starting application: {e}")
+        print(f"Error starting application: {e}", file=sys.stderr)
         cleanup_on_exit()